@@ -2,14 +2,19 @@ from flask import Flask, jsonify, request, send_from_directory, session
 from flask_cors import CORS
 
 from video_service.routes import (
+    get_metric_metadata,
+    get_metric_trends,
     get_session,
+    get_session_status,
     get_sessions,
     get_shot,
+    get_shot_overlay,
     serve_session_video,
     serve_shot_video,
     serve_video,
     upload_session_video,
 )
+from video_service.jobs import ensure_worker_pool
 from auth_service.routes import signup, signin, user
 
 from db_schema import db, dbinit, User, Analysis
@@ -48,6 +53,10 @@ if resetdb:
         db.create_all()
         dbinit()
 
+# the dev server's reloader imports this module in a watcher process too; only the serving child starts workers
+if __name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+    ensure_worker_pool(app)
+
 @app.after_request
 def add_cors_headers(response):
     origin = request.headers.get("Origin")  # Get the actual request origin
@@ -85,10 +94,26 @@ def get_sessions_route():
 def get_session_route(session_id):
     return get_session(session_id)
 
+@app.route("/sessions/<int:session_id>/status", methods=["GET"])
+def get_session_status_route(session_id):
+    return get_session_status(session_id)
+
 @app.route("/shots/<int:shot_id>", methods=["GET"])
 def get_shot_route(shot_id):
     return get_shot(shot_id)
 
+@app.route("/shots/<int:shot_id>/overlay", methods=["GET"])
+def get_shot_overlay_route(shot_id):
+    return get_shot_overlay(shot_id)
+
+@app.route("/metrics/trends", methods=["GET"])
+def get_metric_trends_route():
+    return get_metric_trends()
+
+@app.route("/metrics/metadata", methods=["GET"])
+def get_metric_metadata_route():
+    return get_metric_metadata()
+
 @app.route("/user", methods=["GET"])
 def user_route():
     return user()
@@ -42,6 +42,11 @@ class Analysis(db.Model):
 
 class Session(db.Model):
   __tablename__ = "sessions"
+  # keyset pagination of a user's sessions, newest first (optionally filtered by status)
+  __table_args__ = (
+    db.Index("ix_sessions_user_created", "user_id", "created_at", "id"),
+    db.Index("ix_sessions_user_status_created", "user_id", "status", "created_at", "id"),
+  )
 
   id = db.Column(db.Integer, primary_key=True, index=True)
   user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -52,7 +57,13 @@ class Session(db.Model):
   original_video_url = db.Column(db.String(512), nullable=False)
   shot_count = db.Column(db.Integer, nullable=False, default=0)
   total_frames = db.Column(db.Integer)
+  fps = db.Column(db.Float)
+  frames_processed = db.Column(db.Integer, nullable=False, default=0)
   processing_error = db.Column(db.Text)
+  # per-frame landmark/angle series saved next to the original video (file name inside the session folder)
+  landmarks_file = db.Column(db.String(255))
+  # bumped by every update of the row (and by re-analysis of its shots), the version behind the detail ETag
+  updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
   user = db.relationship("User", back_populates="sessions")
   shots = db.relationship(
@@ -65,23 +76,106 @@ class Session(db.Model):
 
 class ShotAnalysis(db.Model):
   __tablename__ = "shot_analyses"
+  # a session's shots in order, and its first shot for the listing preview
+  __table_args__ = (
+    db.Index("ix_shot_analyses_session_shot", "session_id", "shot_index"),
+  )
 
   id = db.Column(db.Integer, primary_key=True, index=True)
   session_id = db.Column(db.Integer, db.ForeignKey("sessions.id"), nullable=False)
   shot_index = db.Column(db.Integer, nullable=False)
   start_frame = db.Column(db.Integer, nullable=False)
   end_frame = db.Column(db.Integer, nullable=False)
+  # shot range in seconds of the session upload, which original_video_url plays as a time fragment
+  start_time = db.Column(db.Float)
+  end_time = db.Column(db.Float)
   created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
-  metrics_json = db.Column(db.Text, nullable=False)
   make_probability = db.Column(db.Float)
-  form_feedback_json = db.Column(db.Text, nullable=False)
   video_url = db.Column(db.String(512))
   original_video_url = db.Column(db.String(512))
   setup_frame_url = db.Column(db.String(512))
   release_frame_url = db.Column(db.String(512))
   follow_frame_url = db.Column(db.String(512))
+  # small variant of the setup key frame, for lists and video posters
+  thumbnail_url = db.Column(db.String(512))
+  updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
   session = db.relationship("Session", back_populates="shots")
+  # only read by the shot detail (and re-analysis), in the order the analysis produced them
+  metrics = db.relationship(
+    "ShotMetric",
+    back_populates="shot",
+    cascade="all, delete-orphan",
+    order_by="ShotMetric.id"
+  )
+  feedback = db.relationship(
+    "ShotFeedback",
+    back_populates="shot",
+    cascade="all, delete-orphan",
+    order_by="ShotFeedback.id"
+  )
+
+
+class ShotMetric(db.Model):
+  __tablename__ = "shot_metrics"
+  # one value per shot and metric, and per-metric aggregates across a user's shots
+  __table_args__ = (
+    db.UniqueConstraint("shot_id", "metric", name="uq_shot_metrics_shot_metric"),
+    db.Index("ix_shot_metrics_metric_shot", "metric", "shot_id", "value"),
+  )
+
+  id = db.Column(db.Integer, primary_key=True)
+  shot_id = db.Column(db.Integer, db.ForeignKey("shot_analyses.id"), nullable=False)
+  # raw metric key of the analysis, e.g. "S_avg_knee_bend"
+  metric = db.Column(db.String(40), nullable=False)
+  # NULL for NaN (SQLite has no NaN)
+  value = db.Column(db.Float)
+  # integer metrics (e.g. frame counts) share the float column and are cast back by get_value
+  is_integer = db.Column(db.Boolean, nullable=False, default=False)
+
+  shot = db.relationship("ShotAnalysis", back_populates="metrics")
+
+  def get_value(self):
+    """
+    Returns the value with the type the analysis computed it with (int or float), or None for NaN.
+    """
+    if self.value is None or not self.is_integer:
+      return self.value
+    return int(self.value)
+
+
+class ShotFeedback(db.Model):
+  __tablename__ = "shot_feedback"
+  __table_args__ = (
+    db.Index("ix_shot_feedback_shot", "shot_id"),
+  )
+
+  id = db.Column(db.Integer, primary_key=True)
+  shot_id = db.Column(db.Integer, db.ForeignKey("shot_analyses.id"), nullable=False)
+  # FEEDBACK_MESSAGES key and message direction ("low", "high" or "special"), the text is built on read
+  feature = db.Column(db.String(40), nullable=False)
+  direction = db.Column(db.String(10), nullable=False)
+  score = db.Column(db.Float, nullable=False)
+
+  shot = db.relationship("ShotAnalysis", back_populates="feedback")
+
+class ProcessingJob(db.Model):
+  __tablename__ = "processing_jobs"
+
+  id = db.Column(db.Integer, primary_key=True, index=True)
+  session_id = db.Column(db.Integer, db.ForeignKey("sessions.id"), nullable=False)
+  status = db.Column(db.String(20), nullable=False, default="queued", index=True)
+  worker_pid = db.Column(db.Integer)
+  error = db.Column(db.Text)
+  created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+  started_at = db.Column(db.DateTime)
+  finished_at = db.Column(db.DateTime)
+  # pose pool metrics of the job: MediaPipe instances built (and time spent building them) vs reused warm
+  pose_instances_created = db.Column(db.Integer)
+  pose_instances_reused = db.Column(db.Integer)
+  pose_construct_seconds = db.Column(db.Float)
+
+  session = db.relationship("Session")
 
 def dbinit():
   # test users
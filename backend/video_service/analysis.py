@@ -1,13 +1,18 @@
 import os
 import cv2
-import mediapipe as mp
 import numpy as np
 
+from .angles import frame_angles
+from .landmarks import (
+    LEFT_ANKLE, LEFT_EAR, LEFT_ELBOW, LEFT_EYE, LEFT_FOOT_INDEX, LEFT_HEEL, LEFT_HIP, LEFT_INDEX, LEFT_KNEE,
+    LEFT_SHOULDER, LEFT_WRIST, RIGHT_ANKLE, RIGHT_EAR, RIGHT_ELBOW, RIGHT_EYE, RIGHT_FOOT_INDEX, RIGHT_HEEL,
+    RIGHT_HIP, RIGHT_INDEX, RIGHT_KNEE, RIGHT_SHOULDER, RIGHT_WRIST, X, Y, landmarks_to_array, new_landmark_array,
+)
+from .config import KEY_FRAME_FORMAT, KEY_FRAME_QUALITY, KEY_FRAME_SIZES
+from .frames import FrameSource
+from .pose import get_pose_pool
 from .utils import ShootingAnalyzer
 
-mp_pose = mp.solutions.pose
-lm_enum = mp_pose.PoseLandmark # Shortcut to make the arrays cleaner
-
 # --- CONSTANTS & CONFIGURATION ---
 
 REQUIRED_FEATURES = [
@@ -41,288 +46,450 @@ _PHASE_COLORS = {
     "Follow-through": (0, 255, 0), # GREEN
 }
 _DEFAULT_COLOR = (255, 255, 255)   # WHITE
-
-
-# --- PRE-COMPUTED MEDIAPIPE INDICES ---
-
-_DRAWING_POINTS_LEFT = [
-    lm_enum.LEFT_SHOULDER.value, 
-    lm_enum.LEFT_ELBOW.value, 
-    lm_enum.LEFT_WRIST.value, 
-    lm_enum.LEFT_INDEX.value,
-    lm_enum.RIGHT_SHOULDER.value,
-    lm_enum.LEFT_HIP.value, 
-    lm_enum.RIGHT_HIP.value,
-    lm_enum.LEFT_KNEE.value, 
-    lm_enum.RIGHT_KNEE.value,
-    lm_enum.LEFT_ANKLE.value, 
-    lm_enum.RIGHT_ANKLE.value,
-    lm_enum.LEFT_HEEL.value, 
-    lm_enum.RIGHT_HEEL.value,
-    lm_enum.LEFT_FOOT_INDEX.value, 
-    lm_enum.RIGHT_FOOT_INDEX.value,
-    lm_enum.LEFT_EYE.value, 
-    lm_enum.LEFT_EAR.value
-]
-
-_DRAWING_POINTS_RIGHT = [
-    lm_enum.RIGHT_SHOULDER.value, 
-    lm_enum.RIGHT_ELBOW.value, 
-    lm_enum.RIGHT_WRIST.value, 
-    lm_enum.RIGHT_INDEX.value,
-    lm_enum.LEFT_SHOULDER.value,
-    lm_enum.LEFT_HIP.value, 
-    lm_enum.RIGHT_HIP.value,
-    lm_enum.LEFT_KNEE.value, 
-    lm_enum.RIGHT_KNEE.value,
-    lm_enum.LEFT_ANKLE.value, 
-    lm_enum.RIGHT_ANKLE.value,
-    lm_enum.LEFT_HEEL.value, 
-    lm_enum.RIGHT_HEEL.value,
-    lm_enum.LEFT_FOOT_INDEX.value, 
-    lm_enum.RIGHT_FOOT_INDEX.value,
-    lm_enum.RIGHT_EYE.value, 
-    lm_enum.RIGHT_EAR.value
-]
+# file name prefix of the key frame (first frame) of each phase
+KEY_FRAME_PREFIXES = {"Setup": "SETUP", "Release": "RELEASE", "Follow-through": "FOLLOW"}
+_KEY_FRAME_WRITE_PARAMS = {
+    "webp": [cv2.IMWRITE_WEBP_QUALITY, KEY_FRAME_QUALITY],
+    "jpg": [cv2.IMWRITE_JPEG_QUALITY, KEY_FRAME_QUALITY],
+}
+# codec of the annotated shot videos (H.264, so browsers can play them)
+OVERLAY_FOURCC = "avc1"
+
+
+# --- PRE-COMPUTED LANDMARK INDICES ---
+
+_DRAWING_POINTS_LEFT = np.array([
+    LEFT_SHOULDER, 
+    LEFT_ELBOW, 
+    LEFT_WRIST, 
+    LEFT_INDEX,
+    RIGHT_SHOULDER,
+    LEFT_HIP, 
+    RIGHT_HIP,
+    LEFT_KNEE, 
+    RIGHT_KNEE,
+    LEFT_ANKLE, 
+    RIGHT_ANKLE,
+    LEFT_HEEL, 
+    RIGHT_HEEL,
+    LEFT_FOOT_INDEX, 
+    RIGHT_FOOT_INDEX,
+    LEFT_EYE, 
+    LEFT_EAR
+])
+
+_DRAWING_POINTS_RIGHT = np.array([
+    RIGHT_SHOULDER, 
+    RIGHT_ELBOW, 
+    RIGHT_WRIST, 
+    RIGHT_INDEX,
+    LEFT_SHOULDER,
+    LEFT_HIP, 
+    RIGHT_HIP,
+    LEFT_KNEE, 
+    RIGHT_KNEE,
+    LEFT_ANKLE, 
+    RIGHT_ANKLE,
+    LEFT_HEEL, 
+    RIGHT_HEEL,
+    LEFT_FOOT_INDEX, 
+    RIGHT_FOOT_INDEX,
+    RIGHT_EYE, 
+    RIGHT_EAR
+])
 
 _BASE_CONNECTIONS = [
-    (lm_enum.LEFT_HIP.value, lm_enum.LEFT_KNEE.value), 
-    (lm_enum.LEFT_KNEE.value, lm_enum.LEFT_ANKLE.value),
-    (lm_enum.LEFT_ANKLE.value, lm_enum.LEFT_HEEL.value), 
-    (lm_enum.LEFT_HEEL.value, lm_enum.LEFT_FOOT_INDEX.value),
-    (lm_enum.RIGHT_HIP.value, lm_enum.RIGHT_KNEE.value), 
-    (lm_enum.RIGHT_KNEE.value, lm_enum.RIGHT_ANKLE.value),
-    (lm_enum.RIGHT_ANKLE.value, lm_enum.RIGHT_HEEL.value), 
-    (lm_enum.RIGHT_HEEL.value, lm_enum.RIGHT_FOOT_INDEX.value),
-    (lm_enum.LEFT_SHOULDER.value, lm_enum.LEFT_HIP.value), 
-    (lm_enum.RIGHT_SHOULDER.value, lm_enum.RIGHT_HIP.value),
-    (lm_enum.LEFT_HIP.value, lm_enum.RIGHT_HIP.value), 
-    (lm_enum.LEFT_SHOULDER.value, lm_enum.RIGHT_SHOULDER.value)
+    (LEFT_HIP, LEFT_KNEE), 
+    (LEFT_KNEE, LEFT_ANKLE),
+    (LEFT_ANKLE, LEFT_HEEL), 
+    (LEFT_HEEL, LEFT_FOOT_INDEX),
+    (RIGHT_HIP, RIGHT_KNEE), 
+    (RIGHT_KNEE, RIGHT_ANKLE),
+    (RIGHT_ANKLE, RIGHT_HEEL), 
+    (RIGHT_HEEL, RIGHT_FOOT_INDEX),
+    (LEFT_SHOULDER, LEFT_HIP), 
+    (RIGHT_SHOULDER, RIGHT_HIP),
+    (LEFT_HIP, RIGHT_HIP), 
+    (LEFT_SHOULDER, RIGHT_SHOULDER)
 ]
 
-_CONNECTIONS_LEFT = _BASE_CONNECTIONS + [
-    (lm_enum.LEFT_SHOULDER.value, lm_enum.LEFT_ELBOW.value), 
-    (lm_enum.LEFT_ELBOW.value, lm_enum.LEFT_WRIST.value), 
-    (lm_enum.LEFT_WRIST.value, lm_enum.LEFT_INDEX.value), 
-    (lm_enum.LEFT_EYE.value, lm_enum.LEFT_EAR.value)
-]
+_CONNECTIONS_LEFT = np.array(_BASE_CONNECTIONS + [
+    (LEFT_SHOULDER, LEFT_ELBOW), 
+    (LEFT_ELBOW, LEFT_WRIST), 
+    (LEFT_WRIST, LEFT_INDEX), 
+    (LEFT_EYE, LEFT_EAR)
+])
 
-_CONNECTIONS_RIGHT = _BASE_CONNECTIONS + [
-    (lm_enum.RIGHT_SHOULDER.value, lm_enum.RIGHT_ELBOW.value), 
-    (lm_enum.RIGHT_ELBOW.value, lm_enum.RIGHT_WRIST.value), 
-    (lm_enum.RIGHT_WRIST.value, lm_enum.RIGHT_INDEX.value), 
-    (lm_enum.RIGHT_EYE.value, lm_enum.RIGHT_EAR.value)
-]
+_CONNECTIONS_RIGHT = np.array(_BASE_CONNECTIONS + [
+    (RIGHT_SHOULDER, RIGHT_ELBOW), 
+    (RIGHT_ELBOW, RIGHT_WRIST), 
+    (RIGHT_WRIST, RIGHT_INDEX), 
+    (RIGHT_EYE, RIGHT_EAR)
+])
 
 # --- HELPER FUNCTIONS ---
 
-def get_active_landmarks(landmarks, shooting_arm):
-    """
-    Gets specific shooting arm joints needed based on dominant hand.
-
-    Returns dictionary of key joints required for analysis
-    """
-    l_hip, r_hip = landmarks[lm_enum.LEFT_HIP.value], landmarks[lm_enum.RIGHT_HIP.value]
-    l_knee, r_knee = landmarks[lm_enum.LEFT_KNEE.value], landmarks[lm_enum.RIGHT_KNEE.value]
-    l_ankle, r_ankle = landmarks[lm_enum.LEFT_ANKLE.value], landmarks[lm_enum.RIGHT_ANKLE.value]
-
-    if shooting_arm == 'LEFT':
-        return {
-            "shoulder": landmarks[lm_enum.LEFT_SHOULDER.value], 
-            "elbow": landmarks[lm_enum.LEFT_ELBOW.value], 
-            "wrist": landmarks[lm_enum.LEFT_WRIST.value], 
-            "index_finger": landmarks[lm_enum.LEFT_INDEX.value], 
-            "hip": l_hip, 
-            "knee": l_knee, 
-            "ankle": l_ankle, 
-            "eye": landmarks[lm_enum.LEFT_EYE.value], 
-            "ear": landmarks[lm_enum.LEFT_EAR.value], 
-            "left_hip": l_hip, 
-            "right_hip": r_hip, 
-            "left_knee": l_knee, 
-            "right_knee": r_knee, 
-            "left_ankle": l_ankle, 
-            "right_ankle": r_ankle
-        }
-    
-    return {
-        "shoulder": landmarks[lm_enum.RIGHT_SHOULDER.value], 
-        "elbow": landmarks[lm_enum.RIGHT_ELBOW.value], 
-        "wrist": landmarks[lm_enum.RIGHT_WRIST.value], 
-        "index_finger": landmarks[lm_enum.RIGHT_INDEX.value], 
-        "hip": r_hip, 
-        "knee": r_knee, 
-        "ankle": r_ankle, 
-        "eye": landmarks[lm_enum.RIGHT_EYE.value], 
-        "ear": landmarks[lm_enum.RIGHT_EAR.value], 
-        "left_hip": l_hip, 
-        "right_hip": r_hip, 
-        "left_knee": l_knee, 
-        "right_knee": r_knee, 
-        "left_ankle": l_ankle, 
-        "right_ankle": r_ankle
-    }
-
-def calculate_all_angles(analyzer, lm):
+def calculate_all_angles(landmarks, shooting_arm):
     """
-    Runs all biomechanical calculations for the current frame.
+    Runs all biomechanical calculations for the current frame through the batched angle kernel.
     
     Returns dictionary of all calculated angles and metrics needed for analysis.
     """
-    return {
-        'elbow': analyzer.calculate_angle(lm["shoulder"], lm["elbow"], lm["wrist"]),
-        'shoulder': analyzer.calculate_shoulder_angle(lm["hip"], lm["shoulder"], lm["elbow"]),
-        'wrist': analyzer.calculate_angle(lm["elbow"], lm["wrist"], lm["index_finger"]),
-        'left_knee': analyzer.calculate_angle(lm["left_hip"], lm["left_knee"], lm["left_ankle"]),
-        'right_knee': analyzer.calculate_angle(lm["right_hip"], lm["right_knee"], lm["right_ankle"]),
-        'body_lean': analyzer.calculate_body_lean(lm["shoulder"], lm["hip"]),
-        'hip_angle': analyzer.calculate_angle(lm["shoulder"], lm["hip"], lm["knee"]),
-        'dominant_knee': analyzer.calculate_angle(lm["hip"], lm["knee"], lm["ankle"]),
-        'head_tilt': analyzer.calculate_head_angle(lm["eye"], lm["ear"]),
-        'forearm_alignment': analyzer.calculate_forearm_alignment(lm["elbow"], lm["wrist"]),
-        'setpoint': analyzer.calculate_release_setpoint(lm["index_finger"], lm["eye"])
-    }
+    return frame_angles(landmarks, shooting_arm, include_both_knees=True)
+
+def estimate_pose_landmarks(pose, frame, shooting_arm, out=None):
+    """
+    Runs pose estimation on the shooter's half of the frame.
+    If out is given, the landmarks are written into that preallocated (33, 4) array.
+
+    Returns (33, 4) float32 landmark array normalized to the full frame, or None if no pose was found.
+    """
+    _, width, _ = frame.shape
+
+    # crop to just shooter region
+    if shooting_arm == "RIGHT":
+        crop_frame, crop_x_offset = frame[:, :width // 2], 0
+    else:
+        crop_frame, crop_x_offset = frame[:, width // 2:], width // 2
+
+    rgb_frame = cv2.cvtColor(crop_frame, cv2.COLOR_BGR2RGB)
+    results = pose.process(rgb_frame)
+
+    if not results.pose_landmarks:
+        return None
+
+    # normalize coordinates back to full-frame dimensions
+    return landmarks_to_array(
+        results.pose_landmarks.landmark,
+        out=out,
+        crop_x_offset=crop_x_offset,
+        crop_width=width // 2,
+        frame_width=width,
+    )
+
+def get_phase_color(phase):
+    """
+    Returns BGR colour the skeleton is drawn in during phase (white outside the named phases).
+    """
+    return _PHASE_COLORS.get(phase, _DEFAULT_COLOR)
+
+def get_skeleton(shooting_arm):
+    """
+    Returns (landmark ids drawn as joints, (N_edges, 2) landmark id pairs drawn as lines) for the shooting arm.
+    """
+    if shooting_arm == "LEFT":
+        return _DRAWING_POINTS_LEFT, _CONNECTIONS_LEFT
+    return _DRAWING_POINTS_RIGHT, _CONNECTIONS_RIGHT
 
 def draw_pose_annotations(frame, landmarks, width, height, shooting_arm, color):
     """
     Draws the skeleton on the video frame using the pre-computed arrays.
     """
-    pts_to_draw = _DRAWING_POINTS_LEFT if shooting_arm == "LEFT" else _DRAWING_POINTS_RIGHT
-    connections = _CONNECTIONS_LEFT if shooting_arm == "LEFT" else _CONNECTIONS_RIGHT
+    pts_to_draw, connections = get_skeleton(shooting_arm)
+
+    # pixel positions of every joint in one step, float64 and truncated as int() did per joint
+    pixels = (landmarks[:, [X, Y]].astype(np.float64) * (width, height)).astype(np.int32)
 
     # Draw Nodes
-    for idx in pts_to_draw:
-        lm = landmarks[idx]
-        x, y = int(lm.x * width), int(lm.y * height)
+    for x, y in pixels[pts_to_draw].tolist():
         cv2.circle(frame, (x, y), 3, color, -1)
 
     # Draw Lines
-    for start_idx, end_idx in connections:
-        start_lm, end_lm = landmarks[start_idx], landmarks[end_idx]
-        x1, y1 = int(start_lm.x * width), int(start_lm.y * height)
-        x2, y2 = int(end_lm.x * width), int(end_lm.y * height)
+    for (x1, y1), (x2, y2) in pixels[connections].tolist():
         cv2.line(frame, (x1, y1), (x2, y2), color, 1)
 
 
-# --- MAIN ORCHESTRATOR ---
+def update_shot_metrics(analyzer, angles, landmarks, metrics):
+    """
+    Runs one frame through the phase detector, copying the final phase metrics into metrics once the shot ends.
 
-def analyse_video(input_video_path, shooting_arm):
+    Returns the detected phase for the frame.
     """
-    Main function to run the video analysis pipeline on the input video.
+    phase = analyzer.detect_phase(angles, landmarks)
 
-    Returns dictionary containing all calculated metrics, file paths to processed video and key frames.
+    if analyzer.shot_ended:
+        analyzer.shot_ended = False
+
+        # store final metrics for analysis
+        for phase_name, phase_metrics in analyzer.metrics.items():
+            prefix = phase_name[0] + "_"
+            for key, value in phase_metrics.items():
+                if key != 'stored' and not key.startswith('total'):
+                    metrics[prefix + key] = value
+
+    return phase
+
+def fill_required_features(metrics):
+    """
+    Ensures all required features are present, defaulting missing ones to 0.
+    """
+    for feat in REQUIRED_FEATURES:
+        if feat not in metrics:
+            metrics[feat] = 0.0
+            print(f"Warning: Missing required feature {feat}")
+
+def analyse_landmark_series(landmark_frames, shooting_arm, target_fps=30):
+    """
+    Runs the shot analysis over stored pose results only (no video decoding, drawing or key frames).
+    Gives the same metrics as analyse_video replaying the same landmark_frames.
+
+    Returns dictionary of calculated metrics.
     """
     metrics = {}
-    cap = cv2.VideoCapture(input_video_path)
+    analyzer = ShootingAnalyzer(SHOOTING_ARM=shooting_arm, delta_t=1 / target_fps)
 
-    if not cap.isOpened():
-        return {"error": f"Could not open video {input_video_path}"}
-    
+    for frame_count in sorted(landmark_frames):
+        landmarks, angles = landmark_frames[frame_count]
+        if landmarks is None:
+            continue
+        if angles is None:
+            angles = calculate_all_angles(landmarks, shooting_arm)
+        update_shot_metrics(analyzer, angles, landmarks, metrics)
+
+    fill_required_features(metrics)
+    return metrics
+
+def open_clip(input_video_path, start_frame=0, end_frame=None, landmark_frames=None, target_fps=30):
+    """
+    Opens the frames start_frame..end_frame (inclusive, None = end of video) of a video as a clip.
+    Replayed clips (landmark_frames given) keep exactly the frames the detection pass processed, others the
+    frame_skip grid starting at the clip's first frame.
+
+    Returns FrameSource, raises ValueError if the video cannot be opened.
+    """
+    keep_frame = None
+    if landmark_frames is not None:
+        keep_frame = lambda frame_index: frame_index - start_frame in landmark_frames
+    return FrameSource(input_video_path, target_fps=target_fps, start_frame=start_frame, end_frame=end_frame, keep_frame=keep_frame, grid_start=start_frame)
+
+def read_clip_frames(frames, shooting_arm, landmark_frames=None, pose=None, start_frame=0):
+    """
+    Yields (frame index, frame, landmarks, angles) for every kept frame of a clip opened with open_clip. Landmarks come from
+    the stored detection pass if landmark_frames is given, otherwise from pose (angles are then None).
+    """
+    # one landmark buffer reused for every frame pose estimation runs on
+    landmark_buffer = new_landmark_array()
+
+    # only kept frames are decoded, skipped ones are grabbed past
+    for frame_index, frame in frames:
+        if landmark_frames is None:
+            yield frame_index, frame, estimate_pose_landmarks(pose, frame, shooting_arm, out=landmark_buffer), None
+        else:
+            yield (frame_index, frame, *landmark_frames[frame_index - start_frame])
+
+def replay_clip_frames(landmark_frames, start_frame=0, end_frame=None):
+    """
+    Yields (frame index, None, landmarks, angles) for every stored frame of a clip (landmark_frames as in
+    open_clip), in order, without decoding the video: the analysis only needs the frames it keeps as key frames.
+    """
+    for clip_index in sorted(landmark_frames):
+        frame_index = start_frame + clip_index
+        if end_frame is not None and frame_index > end_frame:
+            break
+        yield (frame_index, None, *landmark_frames[clip_index])
+
+def read_video_frames(input_video_path, frame_indices):
+    """
+    Decodes only the given frames of a video (e.g. the key frames of a shot, once its analysis is done).
+
+    Returns dict of frame index to BGR frame.
+    """
+    if not frame_indices:
+        return {}
+
+    wanted = set(frame_indices)
+    with FrameSource(input_video_path, start_frame=min(wanted), end_frame=max(wanted), keep_frame=wanted.__contains__) as frames:
+        return dict(iter(frames))
+
+def get_key_frame_filename(phase, unique_hash, variant="full"):
+    """
+    Returns file name of a key frame variant, e.g. SETUP_shot_1.webp (full) or SETUP_shot_1_thumb.webp.
+    """
+    suffix = "" if variant == "full" else f"_{variant}"
+    return f"{KEY_FRAME_PREFIXES[phase]}_{unique_hash}{suffix}.{KEY_FRAME_FORMAT}"
+
+def write_key_frames(key_frames, frames_by_index, shooting_arm, folder_path):
+    """
+    Writes every KEY_FRAME_SIZES variant of each phase's key frame to folder_path: the frame is downscaled
+    (never upscaled) so its longest side fits the variant, then the skeleton is drawn on it at that size.
+    key_frames maps phase to (frame index, landmarks), frames_by_index frame index to the decoded frame.
+    """
+    unique_hash = os.path.basename(folder_path)
+
+    for phase, (frame_index, landmarks) in key_frames.items():
+        frame = frames_by_index.get(frame_index)
+        if frame is None:
+            print(f"Warning: Could not read {phase} key frame {frame_index}")
+            continue
+
+        source_height, source_width, _ = frame.shape
+        for variant, max_side in KEY_FRAME_SIZES.items():
+            scale = min(1.0, max_side / max(source_width, source_height))
+            width, height = max(1, round(source_width * scale)), max(1, round(source_height * scale))
+            image = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA) if scale < 1.0 else frame.copy()
+
+            draw_pose_annotations(image, landmarks, width, height, shooting_arm, get_phase_color(phase))
+            cv2.imwrite(os.path.join(folder_path, get_key_frame_filename(phase, unique_hash, variant)), image, _KEY_FRAME_WRITE_PARAMS[KEY_FRAME_FORMAT])
+
+# --- MAIN ORCHESTRATOR ---
+
+def analyse_video(input_video_path, shooting_arm, landmark_frames=None, pose=None, start_frame=0, end_frame=None, output_folder=None):
+    """
+    Main function to run the video analysis pipeline on the input video.
+    With start_frame/end_frame (inclusive), only that range of the video is analysed as a clip, so a shot
+    can be read straight from the session upload; outputs then go to output_folder.
+    If landmark_frames (clip frame index -> (landmarks, angles)) is given, the stored pose results are
+    replayed instead of running pose estimation, and only the key frames are decoded (a video that cannot be
+    opened then raises ValueError from that read).
+    Otherwise pose runs on a caller-owned instance, or on a warm one from the process's pose pool.
+    The annotated video is not part of the analysis, render_overlay_video draws it when it is first requested.
+
+    Returns dictionary containing all calculated metrics and file paths to the key frames.
+    """
     target_fps = 30
-    actual_fps = cap.get(cv2.CAP_PROP_FPS) or target_fps
-    frame_rate_ratio = target_fps / actual_fps
-    frame_skip = int(1 / frame_rate_ratio) if frame_rate_ratio < 1 else 1
+    folder_path = output_folder or os.path.dirname(input_video_path)
+    read_frames = lambda frame_indices: read_video_frames(input_video_path, frame_indices)
+
+    if landmark_frames is not None:
+        clip_frames = replay_clip_frames(landmark_frames, start_frame, end_frame)
+        return analyse_clip_frames(clip_frames, shooting_arm, folder_path, read_frames, target_fps)
+
+    try:
+        frames = open_clip(input_video_path, start_frame, end_frame, target_fps=target_fps)
+    except ValueError:
+        return {"error": f"Could not open video {input_video_path}"}
+
+    owns_pose = pose is None
+    if owns_pose:
+        pose = get_pose_pool().acquire()
+
+    try:
+        clip_frames = read_clip_frames(frames, shooting_arm, pose=pose, start_frame=start_frame)
+        return analyse_clip_frames(clip_frames, shooting_arm, folder_path, read_frames, target_fps)
+    finally:
+        frames.release()
+        if owns_pose:
+            get_pose_pool().release(pose)
+
+def analyse_clip_frames(clip_frames, shooting_arm, folder_path, read_frames, target_fps=30):
+    """
+    Runs the shot analysis over the (frame index, frame, landmarks, angles) of a clip, in order. Only the index
+    and landmarks of the first frame of each phase are kept while the clip is read; read_frames(frame indices)
+    then returns those frames (dict of index to frame) and the annotated key frames are written to folder_path.
+    Shared by analyse_video, which decodes them again (replayed clips are not decoded otherwise), and the
+    streaming session pipeline, which still buffers them.
+
+    Returns dictionary containing all calculated metrics, the key frame indices and file paths to the key frames.
+    """
+    metrics = {}
     delta_t = 1 / target_fps
 
     # File Path Setup
-    folder_path = os.path.dirname(input_video_path)
     unique_hash = os.path.basename(folder_path)
-    processed_video_path = os.path.join(folder_path, f"VIDEO_{unique_hash}.mp4")
-    setup_frame_path = os.path.join(folder_path, f"SETUP_{unique_hash}.png")
-    release_frame_path = os.path.join(folder_path, f"RELEASE_{unique_hash}.png")
-    follow_frame_path = os.path.join(folder_path, f"FOLLOW_{unique_hash}.png")
+    setup_frame_path = os.path.join(folder_path, get_key_frame_filename("Setup", unique_hash))
+    release_frame_path = os.path.join(folder_path, get_key_frame_filename("Release", unique_hash))
+    follow_frame_path = os.path.join(folder_path, get_key_frame_filename("Follow-through", unique_hash))
 
-    frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    fourcc = cv2.VideoWriter_fourcc(*'avc1')
-    out = cv2.VideoWriter(processed_video_path, fourcc, target_fps, (frame_width, frame_height))
-
-    pose = mp_pose.Pose(static_image_mode=False, model_complexity=1, min_detection_confidence=0.5, min_tracking_confidence=0.5)
     analyzer = ShootingAnalyzer(SHOOTING_ARM=shooting_arm, delta_t=delta_t)
+    # phase -> (frame index, landmarks) of its first frame
+    key_frames = {}
 
-    first_frames = {"Setup": None, "Release": None, "Follow-through": None}
-    frame_count = 0
+    for frame_index, frame, landmarks, angles in clip_frames:
+        # process landmarks
+        if landmarks is None:
+            continue
 
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
+        # get angles, the analyzer reads the joints it needs straight from the landmark array
+        if angles is None:
+            angles = calculate_all_angles(landmarks, shooting_arm)
 
-        if frame_count % frame_skip != 0:
-            frame_count += 1
-            continue
+        # detect current shooting phase and update metrics state
+        phase = update_shot_metrics(analyzer, angles, landmarks, metrics)
+
+        # remember the first frame in each phase (the landmark array may be a reused buffer)
+        if phase in KEY_FRAME_PREFIXES and phase not in key_frames:
+            key_frames[phase] = (frame_index, landmarks.copy())
+
+    # extract and save first frame for each phase
+    frames_by_index = read_frames(sorted(frame_index for frame_index, _ in key_frames.values()))
+    write_key_frames(key_frames, frames_by_index, shooting_arm, folder_path)
+
+    fill_required_features(metrics)
 
-        # 1. crop to just shooter region
-        height, width, _ = frame.shape 
-        
-        if shooting_arm == "RIGHT":
-            crop_frame, crop_x_offset = frame[:, :width // 2], 0
-        else:
-            crop_frame, crop_x_offset = frame[:, width // 2:], width // 2
-        
-        rgb_frame = cv2.cvtColor(crop_frame, cv2.COLOR_BGR2RGB)
-        results = pose.process(rgb_frame)
-
-        # 2. process landmarks
-        if results.pose_landmarks:
-            landmarks = results.pose_landmarks.landmark
-            
-            # normalize coordinates back to full-frame dimensions
-            for lm in landmarks:
-                lm.x = (lm.x * (width // 2) + crop_x_offset) / width
-
-            # get landmarks and angles
-            active_lm = get_active_landmarks(landmarks, shooting_arm)
-            angles = calculate_all_angles(analyzer, active_lm)
-            # generate subset of landmarks needed for phase detection
-            tracking_subset = {k: active_lm[k] for k in ['wrist', 'eye', 'shoulder', 'hip', 'elbow', 'index_finger']}
-
-            # detect current shooting phase
-            phase = analyzer.detect_phase(angles, tracking_subset)
-
-            # 3. update metrics state
-            if analyzer.shot_ended:
-                analyzer.shot_ended = False
-
-                # store final metrics for analysis
-                for phase_name, phase_metrics in analyzer.metrics.items():
-                    prefix = phase_name[0] + "_"
-                    for key, value in phase_metrics.items():
-                        if key != 'stored' and not key.startswith('total'):
-                            metrics[prefix + key] = value
-            
-            # 4. draw overlays
-            color = _PHASE_COLORS.get(phase, _DEFAULT_COLOR)
-            draw_pose_annotations(frame, landmarks, width, height, shooting_arm, color)
-
-            # 5. get images for first frame in each phase
-            if phase in first_frames and first_frames[phase] is None:
-                first_frames[phase] = frame.copy()
-
-        # write frame to output video
-        out.write(frame)
-        frame_count += 1
-
-    # cleanup
-    cap.release()
-    pose.close()
-    out.release()
-
-    # save first frame for each phase
-    if first_frames["Setup"] is not None: cv2.imwrite(setup_frame_path, first_frames["Setup"])
-    if first_frames["Release"] is not None: cv2.imwrite(release_frame_path, first_frames["Release"])
-    if first_frames["Follow-through"] is not None: cv2.imwrite(follow_frame_path, first_frames["Follow-through"])
-
-    # ensure all required features are present
-    for feat in REQUIRED_FEATURES:
-        if feat not in metrics:
-            metrics[feat] = 0.0
-            print(f"Warning: Missing required feature {feat}")
-        
     return {
         "metrics": metrics,
-        "processed_video_path": processed_video_path,
+        "key_frames": {phase: frame_index for phase, (frame_index, _) in key_frames.items()},
         "setup_frame_path": setup_frame_path,
         "release_frame_path": release_frame_path,
         "follow_frame_path": follow_frame_path
-    }
\ No newline at end of file
+    }
+
+def build_overlay_series(landmark_frames, shooting_arm, target_fps=30):
+    """
+    Replays stored pose results through the phase detector as render_overlay_video does, for clients that
+    draw the skeleton over the original clip themselves.
+
+    Returns (clip frame indices, phase per frame (None without a pose), (N_frames, N_points, 2) normalized x/y
+    of the get_skeleton joints, NaN without a pose).
+    """
+    pts_to_draw, _ = get_skeleton(shooting_arm)
+    frame_indices = sorted(landmark_frames)
+    phases = []
+    points = np.full((len(frame_indices), len(pts_to_draw), 2), np.nan, dtype=np.float32)
+
+    analyzer = ShootingAnalyzer(SHOOTING_ARM=shooting_arm, delta_t=1 / target_fps)
+    metrics = {}
+
+    for row, frame_index in enumerate(frame_indices):
+        landmarks, angles = landmark_frames[frame_index]
+        if landmarks is None:
+            phases.append(None)
+            continue
+        if angles is None:
+            angles = calculate_all_angles(landmarks, shooting_arm)
+
+        phases.append(update_shot_metrics(analyzer, angles, landmarks, metrics))
+        points[row] = landmarks[pts_to_draw][:, [X, Y]]
+
+    return frame_indices, phases, points
+
+def render_overlay_video(input_video_path, shooting_arm, output_path, start_frame=0, end_frame=None, landmark_frames=None):
+    """
+    Writes the annotated video of a clip: every kept frame with the skeleton drawn in the colour of its phase.
+    Frames and phases are the ones analyse_video processes for the same arguments, so the overlay matches
+    the stored metrics and key frames. Without landmark_frames, pose runs on a warm instance of the pose pool.
+
+    Returns output_path, raises ValueError if the video cannot be read or the encoder cannot be opened.
+    """
+    target_fps = 30
+    frames = open_clip(input_video_path, start_frame, end_frame, landmark_frames, target_fps)
+
+    fourcc = cv2.VideoWriter_fourcc(*OVERLAY_FOURCC)
+    out = cv2.VideoWriter(output_path, fourcc, target_fps, (frames.width, frames.height))
+    pose = get_pose_pool().acquire() if landmark_frames is None else None
+
+    analyzer = ShootingAnalyzer(SHOOTING_ARM=shooting_arm, delta_t=1 / target_fps)
+    # the phase detector is driven exactly as during analysis, its metrics are not needed here
+    metrics = {}
+
+    try:
+        if not out.isOpened():
+            raise ValueError(f"Could not open {OVERLAY_FOURCC} encoder for {output_path}")
+
+        for _, frame, landmarks, angles in read_clip_frames(frames, shooting_arm, landmark_frames, pose, start_frame):
+            if landmarks is not None:
+                if angles is None:
+                    angles = calculate_all_angles(landmarks, shooting_arm)
+                phase = update_shot_metrics(analyzer, angles, landmarks, metrics)
+
+                height, width, _ = frame.shape
+                draw_pose_annotations(frame, landmarks, width, height, shooting_arm, get_phase_color(phase))
+
+            out.write(frame)
+    finally:
+        out.release()
+        frames.release()
+        if pose is not None:
+            get_pose_pool().release(pose)
+
+    return output_path
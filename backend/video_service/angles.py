@@ -0,0 +1,101 @@
+import numpy as np
+
+from .landmarks import SIDE_LANDMARK_INDICES, X, Y, get_side_indices
+
+# columns returned by compute_angles, in the order build_angles has always produced them
+ANGLE_COLUMNS = [
+    "elbow",
+    "shoulder",
+    "wrist",
+    "body_lean",
+    "hip_angle",
+    "dominant_knee",
+    "head_tilt",
+    "forearm_alignment",
+    "setpoint",
+]
+
+
+# --- BATCHED ANGLE KERNEL ---
+
+def compute_angles(landmarks, shooting_arm="RIGHT", include_both_knees=False):
+    """
+    Vectorized version of the ShootingAnalyzer angle methods over a batch of frames.
+    Maths is done in float64 with the same formulas as the scalar methods, which stay the reference: values
+    agree within float rounding (np.dot/np.linalg.norm may round differently), see bench_angles.
+
+    Returns dict of angle name to (N_frames,) float64 array.
+    """
+    landmarks = np.asarray(landmarks)
+    if landmarks.ndim == 2:
+        landmarks = landmarks[None]
+    # x/y only, promoted to float64 as the scalar methods do
+    points = landmarks[:, :, [X, Y]].astype(np.float64)
+
+    side = get_side_indices(shooting_arm)
+    sign = 1.0 if shooting_arm == "RIGHT" else -1.0
+
+    shoulder = points[:, side["shoulder"]]
+    elbow = points[:, side["elbow"]]
+    wrist = points[:, side["wrist"]]
+    index_finger = points[:, side["index_finger"]]
+    hip = points[:, side["hip"]]
+    knee = points[:, side["knee"]]
+    ankle = points[:, side["ankle"]]
+    eye = points[:, side["eye"]]
+    ear = points[:, side["ear"]]
+
+    # shoulder sign follows the side of the hip->shoulder->elbow turn, zero falls to the negative branch
+    shoulder_base = joint_angles(hip, shoulder, elbow)
+    cross_z = _cross_z(hip - shoulder, elbow - shoulder)
+    outward = cross_z < 0 if shooting_arm == "RIGHT" else cross_z > 0
+
+    angles = {
+        "elbow": joint_angles(shoulder, elbow, wrist),
+        "shoulder": np.where(outward, shoulder_base, -shoulder_base),
+        "wrist": joint_angles(elbow, wrist, index_finger),
+        "body_lean": sign * np.degrees(np.arctan2(shoulder[:, 0] - hip[:, 0], -(shoulder[:, 1] - hip[:, 1]))),
+        "hip_angle": joint_angles(shoulder, hip, knee),
+        "dominant_knee": joint_angles(hip, knee, ankle),
+        "head_tilt": -np.degrees(np.arctan2(eye[:, 1] - ear[:, 1], eye[:, 0] - ear[:, 0])),
+        "forearm_alignment": sign * np.degrees(np.arctan2(wrist[:, 0] - elbow[:, 0], -(wrist[:, 1] - elbow[:, 1]))),
+        "setpoint": (sign * (index_finger[:, 0] - eye[:, 0]) * 1000) / 2,
+    }
+
+    if include_both_knees:
+        left, right = SIDE_LANDMARK_INDICES["LEFT"], SIDE_LANDMARK_INDICES["RIGHT"]
+        angles["left_knee"] = joint_angles(points[:, left["hip"]], points[:, left["knee"]], points[:, left["ankle"]])
+        angles["right_knee"] = joint_angles(points[:, right["hip"]], points[:, right["knee"]], points[:, right["ankle"]])
+
+    return angles
+
+def frame_angles(landmarks, shooting_arm="RIGHT", include_both_knees=False):
+    """
+    Runs the kernel on a single (33, 4) frame.
+
+    Returns dict of angle name to value, in the same form as ShootingAnalyzer's scalar methods.
+    """
+    return {name: values[0] for name, values in compute_angles(landmarks, shooting_arm, include_both_knees).items()}
+
+def joint_angles(a, b, c):
+    """
+    Batched calculate_angle: the angle at b between b->a and b->c.
+
+    Returns (N,) array of angles in degrees.
+    """
+    ba = a - b
+    bc = c - b
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosine_angle = _dot(ba, bc) / (np.sqrt(_dot(ba, ba)) * np.sqrt(_dot(bc, bc)))
+    return np.degrees(np.arccos(np.clip(cosine_angle, -1.0, 1.0)))
+
+
+# --- PRIVATE / HELPER FUNCTIONS ---
+
+def _dot(u, v):
+    # plain products and sum, np.dot on a 2-vector may fuse the multiply-add and differ in the last bit
+    return u[:, 0] * v[:, 0] + u[:, 1] * v[:, 1]
+
+def _cross_z(u, v):
+    return u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]
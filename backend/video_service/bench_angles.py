@@ -0,0 +1,100 @@
+"""
+Equivalence check and microbenchmark of the batched angle kernel (angles.compute_angles).
+
+Compares every kernel column with the ShootingAnalyzer scalar methods, which stay the reference, on
+random landmark frames for both arms (a share of them with coincident joints, whose angles are NaN on
+both sides). Values must agree within ANGLE_TOLERANCE degrees; the largest difference per column is
+reported and the check exits non-zero if any exceeds it. It then times both over the whole batch.
+
+Usage (from the backend folder):
+    python -m video_service.bench_angles [--frames N] [--seed N]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from .angles import ANGLE_COLUMNS, compute_angles
+from .landmarks import LANDMARK_FIELDS, NUM_LANDMARKS, SIDE_LANDMARK_INDICES, get_side_indices
+from .utils import ShootingAnalyzer
+
+# degrees; arccos amplifies last-bit differences of the cosine near 0 and 180 degrees
+ANGLE_TOLERANCE = 1e-6
+
+
+def build_landmark_frames(num_frames, seed=0):
+    """
+    Returns (num_frames, 33, 4) float32 frames of random joints, every tenth with the elbow on the shoulder.
+    """
+    rng = np.random.default_rng(seed)
+    frames = rng.random((num_frames, NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32)
+    for side in SIDE_LANDMARK_INDICES.values():
+        frames[::10, side["elbow"]] = frames[::10, side["shoulder"]]
+    return frames
+
+def scalar_angles(analyzer, landmarks, shooting_arm):
+    """
+    Returns dict of angle name to value of one frame, from the scalar methods (the reference).
+    """
+    side = {name: landmarks[index] for name, index in get_side_indices(shooting_arm).items()}
+    left, right = SIDE_LANDMARK_INDICES["LEFT"], SIDE_LANDMARK_INDICES["RIGHT"]
+    return {
+        "elbow": analyzer.calculate_angle(side["shoulder"], side["elbow"], side["wrist"]),
+        "shoulder": analyzer.calculate_shoulder_angle(side["hip"], side["shoulder"], side["elbow"]),
+        "wrist": analyzer.calculate_angle(side["elbow"], side["wrist"], side["index_finger"]),
+        "body_lean": analyzer.calculate_body_lean(side["shoulder"], side["hip"]),
+        "hip_angle": analyzer.calculate_angle(side["shoulder"], side["hip"], side["knee"]),
+        "dominant_knee": analyzer.calculate_angle(side["hip"], side["knee"], side["ankle"]),
+        "head_tilt": analyzer.calculate_head_angle(side["eye"], side["ear"]),
+        "forearm_alignment": analyzer.calculate_forearm_alignment(side["elbow"], side["wrist"]),
+        "setpoint": analyzer.calculate_release_setpoint(side["index_finger"], side["eye"]),
+        "left_knee": analyzer.calculate_angle(landmarks[left["hip"]], landmarks[left["knee"]], landmarks[left["ankle"]]),
+        "right_knee": analyzer.calculate_angle(landmarks[right["hip"]], landmarks[right["knee"]], landmarks[right["ankle"]]),
+    }
+
+def compare_angles(frames, shooting_arm):
+    """
+    Returns (dict of angle name to largest absolute difference, kernel seconds, scalar seconds).
+    """
+    start = time.perf_counter()
+    kernel = compute_angles(frames, shooting_arm, include_both_knees=True)
+    kernel_time = time.perf_counter() - start
+
+    analyzer = ShootingAnalyzer(SHOOTING_ARM=shooting_arm)
+    start = time.perf_counter()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rows = [scalar_angles(analyzer, landmarks, shooting_arm) for landmarks in frames]
+    scalar_time = time.perf_counter() - start
+
+    differences = {}
+    for name, kernel_values in kernel.items():
+        reference = np.array([row[name] for row in rows], dtype=np.float64)
+        both_nan = np.isnan(reference) & np.isnan(kernel_values)
+        # a NaN on one side only is an infinite difference
+        difference = np.where(both_nan, 0.0, np.abs(kernel_values - reference))
+        differences[name] = float(np.max(np.nan_to_num(difference, nan=np.inf)))
+
+    return differences, kernel_time, scalar_time
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check and benchmark the batched angle kernel.")
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    frames = build_landmark_frames(args.frames, args.seed)
+    failed = False
+    for shooting_arm in ("RIGHT", "LEFT"):
+        differences, kernel_time, scalar_time = compare_angles(frames, shooting_arm)
+        print(f"{shooting_arm}: {args.frames} frames, kernel {kernel_time * 1000:.1f} ms, scalar {scalar_time * 1000:.1f} ms")
+        for name in ANGLE_COLUMNS + ["left_knee", "right_knee"]:
+            over_tolerance = differences[name] > ANGLE_TOLERANCE
+            failed |= over_tolerance
+            print(f"  {name:<18} max diff {differences[name]:.3e}{'  FAILED' if over_tolerance else ''}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Import-time benchmark for the web and processing entry points.
+
+Each module is imported in a fresh interpreter, timed, and checked for the heavy dependencies that should
+only be loaded by processing workers (model deserialization, sklearn, pandas, mediapipe). It then times the
+lazy loads a processing worker pays on start (scoring.load_models and pose.get_pose_solution).
+Exits non-zero if a web module is over budget or pulls in a heavy dependency.
+
+Usage (from the backend folder):
+    python -m video_service.bench_imports [--budget SECONDS] [--rounds N]
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+# modules a web worker imports to serve requests
+WEB_MODULES = ["video_service.routes", "auth_service.routes", "db_schema"]
+# dependencies only processing workers should load
+HEAVY_MODULES = ["joblib", "sklearn", "pandas", "mediapipe"]
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+_WORKER_LOAD_SCRIPT = """
+import json, time
+from video_service.pose import get_pose_solution
+from video_service.scoring import load_models
+timings = {}
+for name, load in (("scoring.load_models", load_models), ("pose.get_pose_solution", get_pose_solution)):
+    start = time.perf_counter()
+    try:
+        load()
+        timings[name] = time.perf_counter() - start
+    except Exception as e:
+        timings[name] = str(e)
+print(json.dumps(timings))
+"""
+
+
+def run_script(script):
+    """
+    Runs a snippet in a fresh interpreter from the current folder.
+
+    Returns its JSON output.
+    """
+    completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def time_import(module, rounds):
+    """
+    Returns (best-of-rounds import seconds, heavy modules the import loaded).
+    """
+    results = [run_script(_IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)) for _ in range(rounds)]
+    return min(result["seconds"] for result in results), results[0]["loaded"]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark import time of the web and worker entry points.")
+    parser.add_argument("--budget", type=float, default=1.0, help="max import seconds for a web module")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    failed = False
+    print(f"{'module':<28} {'import s':>9}  heavy dependencies loaded")
+    for module in WEB_MODULES:
+        seconds, loaded = time_import(module, args.rounds)
+        failed |= seconds > args.budget or bool(loaded)
+        print(f"{module:<28} {seconds:>9.3f}  {', '.join(loaded) or '-'}")
+
+    print("\nprocessing worker start:")
+    for name, result in run_script(_WORKER_LOAD_SCRIPT).items():
+        print(f"  {name:<26} {result:.3f} s" if isinstance(result, float) else f"  {name:<26} failed: {result}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
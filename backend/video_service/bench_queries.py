@@ -0,0 +1,283 @@
+"""
+Query-count regression check of the session and shot read endpoints.
+
+Seeds an in-memory database with one user's sessions and shots (with their metric and feedback rows),
+calls the route functions directly and counts the SQL statements each one issues. Every endpoint has a fixed
+budget that must not grow with the number of sessions or shots; the detail endpoints are counted cold,
+served from the response cache and revalidated with If-None-Match, and a re-analysis that only changes a
+shot's feedback rows must change both the shot's and the session's ETag. Uploads without a video file
+must be rejected with 400 (not fail inside the route). It then walks the whole /sessions listing
+page by page and checks every session comes back once, in order, and prints the listing's query plan.
+Exits non-zero if a budget is exceeded or the walk is wrong.
+
+Usage (from the backend folder):
+    python -m video_service.bench_queries [--sessions N] [--shots-per-session N] [--page-size N]
+"""
+import argparse
+import io
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import session
+from sqlalchemy import event
+
+from db_schema import Session as VideoSession, ShotAnalysis, ShotFeedback, ShotMetric, User, db
+from .jobs import create_worker_app
+from .config import FEEDBACK_MESSAGES
+from .reanalyse import apply_session_result
+from .routes import DETAIL_CACHE, get_metric_trends, upload_session_video, get_session, get_sessions, get_shot, query_session_summaries
+
+# statements per request, whatever the number of sessions and shots
+QUERY_BUDGETS = {
+    "GET /sessions": 1,
+    "GET /sessions?after=": 1,
+    "GET /sessions/<id>": 3,
+    "GET /sessions/<id> cached": 0,
+    "GET /sessions/<id> 304": 1,
+    "GET /shots/<id>": 4,
+    "GET /shots/<id> cached": 0,
+    "GET /shots/<id> 304": 1,
+    "GET /metrics/trends": 1,
+}
+EXPECTED_STATUS = {"GET /sessions/<id> 304": 304, "GET /shots/<id> 304": 304}
+
+
+def seed_database(num_sessions, shots_per_session):
+    """
+    Returns (user id, a session id, a shot id) of the seeded data.
+    """
+    user = User("bench", "bench@example.com", "-")
+    db.session.add(user)
+    db.session.flush()
+
+    metrics = {f"S_metric_{index}": index * 1.5 for index in range(30)}
+    feedback_features = list(FEEDBACK_MESSAGES)[:5]
+    created_at = datetime.now(timezone.utc)
+
+    for session_index in range(num_sessions):
+        session_record = VideoSession(
+            user_id=user.id,
+            hashed_filename=f"bench{session_index}",
+            shooting_arm="RIGHT",
+            status="complete",
+            original_video_url="-",
+            shot_count=shots_per_session,
+            created_at=created_at - timedelta(minutes=session_index),
+        )
+        db.session.add(session_record)
+        db.session.flush()
+
+        db.session.add_all([
+            ShotAnalysis(
+                session_id=session_record.id,
+                shot_index=shot_index,
+                start_frame=shot_index * 100,
+                end_frame=shot_index * 100 + 60,
+                make_probability=50.0,
+                metrics=[ShotMetric(metric=metric, value=value) for metric, value in metrics.items()],
+                feedback=[ShotFeedback(feature=feature, direction="low", score=-10.0) for feature in feedback_features],
+                video_url="-",
+                thumbnail_url="-",
+                created_at=created_at,
+            )
+            for shot_index in range(1, shots_per_session + 1)
+        ])
+
+    db.session.commit()
+    first_session = VideoSession.query.order_by(VideoSession.id).first()
+    return user.id, first_session.id, first_session.shots[0].id
+
+def call_view(app, user_id, view, *args, query_string=None, headers=None, method="GET", data=None):
+    """
+    Calls a route function as user_id in a fresh request (and DB session).
+
+    Returns (number of SQL statements, seconds, response, status).
+    """
+    statements = []
+    on_execute = lambda *event_args: statements.append(event_args[2])
+
+    with app.test_request_context(query_string=query_string, headers=headers, method=method, data=data):
+        session["user_id"] = user_id
+        event.listen(db.engine, "before_cursor_execute", on_execute)
+        try:
+            start = time.perf_counter()
+            response, status = view(*args)
+            elapsed = time.perf_counter() - start
+        finally:
+            event.remove(db.engine, "before_cursor_execute", on_execute)
+
+    return len(statements), elapsed, response, status
+
+def check_reanalysis_etags(app, user_id, session_id, shot_id):
+    """
+    Re-analyses one shot with only its feedback scores changed (same metrics and probability) and fetches
+    the session and shot details before and after, through the response cache.
+
+    Returns dict of endpoint name to whether its ETag changed.
+    """
+    endpoints = {"GET /sessions/<id>": (get_session, session_id), "GET /shots/<id>": (get_shot, shot_id)}
+
+    def fetch_etags():
+        etags = {}
+        for name, (view, view_id) in endpoints.items():
+            with app.app_context():
+                _, _, response, _ = call_view(app, user_id, view, view_id)
+            etags[name] = response.get_etag()[0]
+        return etags
+
+    DETAIL_CACHE.clear()
+    etags_before = fetch_etags()
+
+    with app.app_context():
+        session_record = db.session.get(VideoSession, session_id)
+        shot = db.session.get(ShotAnalysis, shot_id)
+        shot_result = {
+            "start_frame": shot.start_frame,
+            "end_frame": shot.end_frame,
+            "metrics": {record.metric: record.get_value() for record in shot.metrics},
+            "probability": shot.make_probability,
+            "feedback": [
+                {"feature": record.feature, "direction": record.direction, "score": record.score - 1}
+                for record in shot.feedback
+            ],
+        }
+        apply_session_result(session_record, {"shots": [shot_result]})
+        db.session.commit()
+
+    # past the cache's ttl, so the versions are read again
+    DETAIL_CACHE.clear()
+    etags_after = fetch_etags()
+    return {name: etags_before[name] != etags_after[name] for name in endpoints}
+
+def check_upload_rejections(app, user_id):
+    """
+    Posts uploads without a usable video file.
+
+    Returns dict of case to (status, error message).
+    """
+    cases = {
+        "no video field": {"shootingArm": "RIGHT"},
+        "empty filename": {"shootingArm": "RIGHT", "video": (io.BytesIO(b""), "")},
+    }
+
+    results = {}
+    for name, data in cases.items():
+        with app.app_context():
+            _, _, response, status = call_view(app, user_id, upload_session_video, method="POST", data=data)
+            results[name] = (status, response.get_json().get("error"))
+    return results
+
+def walk_session_pages(app, user_id, page_size):
+    """
+    Follows next_cursor through the whole /sessions listing.
+
+    Returns (session ids in listing order, number of pages).
+    """
+    session_ids = []
+    pages = 0
+    query_string = {"limit": page_size}
+
+    while True:
+        with app.app_context():
+            _, _, response, _ = call_view(app, user_id, get_sessions, query_string=query_string)
+        page = response.get_json()
+        session_ids.extend(session_summary["id"] for session_summary in page["sessions"])
+        pages += 1
+        if page["next_cursor"] is None:
+            return session_ids, pages
+        query_string = {"limit": page_size, "after": page["next_cursor"]}
+
+def explain_session_listing(user_id, after):
+    """
+    Returns SQLite's query plan lines for a /sessions page after the given (created_at, id).
+    """
+    statements = []
+    on_execute = lambda *event_args: statements.append((event_args[2], event_args[3]))
+    event.listen(db.engine, "before_cursor_execute", on_execute)
+    try:
+        query_session_summaries(user_id, limit=21, after=after)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", on_execute)
+
+    statement, parameters = statements[0]
+    plan = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in plan]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count the SQL statements of the session and shot endpoints.")
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--shots-per-session", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    app = create_worker_app("sqlite://")
+    app.secret_key = "bench"
+
+    with app.app_context():
+        db.create_all()
+        user_id, session_id, shot_id = seed_database(args.sessions, args.shots_per_session)
+        # a page deep in the listing
+        middle_session = VideoSession.query.order_by(VideoSession.created_at.desc()).offset(args.sessions // 2).first()
+        after = (middle_session.created_at, middle_session.id)
+
+    # name: (view, query string, whether it starts with an empty response cache, view args)
+    endpoints = {
+        "GET /sessions": (get_sessions, None, True),
+        "GET /sessions?after=": (get_sessions, {"after": f"{after[0].isoformat()},{after[1]}"}, True),
+        "GET /sessions/<id>": (get_session, None, True, session_id),
+        "GET /sessions/<id> cached": (get_session, None, False, session_id),
+        "GET /sessions/<id> 304": (get_session, None, True, session_id),
+        "GET /shots/<id>": (get_shot, None, True, shot_id),
+        "GET /shots/<id> cached": (get_shot, None, False, shot_id),
+        "GET /shots/<id> 304": (get_shot, None, True, shot_id),
+        "GET /metrics/trends": (get_metric_trends, None, True),
+    }
+    etags = {}
+
+    failed = False
+    print(f"{args.sessions} sessions x {args.shots_per_session} shots")
+    print(f"{'endpoint':<26} {'queries':>6} {'budget':>7} {'ms':>8}")
+    for name, (view, query_string, cold, *view_args) in endpoints.items():
+        if cold:
+            DETAIL_CACHE.clear()
+        # the 304 rows send the ETag of the first response of the same endpoint
+        etag = etags.get(name.removesuffix(" 304")) if name.endswith(" 304") else None
+        headers = {"If-None-Match": f'"{etag}"'} if etag else None
+        with app.app_context():
+            queries, elapsed, response, status = call_view(app, user_id, view, *view_args, query_string=query_string, headers=headers)
+        etags[name] = response.get_etag()[0]
+        over_budget = queries > QUERY_BUDGETS[name] or status != EXPECTED_STATUS.get(name, 200)
+        failed |= over_budget
+        print(f"{name:<26} {queries:>6} {QUERY_BUDGETS[name]:>7} {elapsed * 1000:>8.1f}{'  FAILED' if over_budget else ''}")
+
+    etags_changed = check_reanalysis_etags(app, user_id, session_id, shot_id)
+    failed |= not all(etags_changed.values())
+    print("\nre-analysis of a shot's feedback:")
+    for name, changed in etags_changed.items():
+        print(f"  {name} ETag {'changed' if changed else 'UNCHANGED'}")
+
+    expected_rejections = {"no video field": (400, "No video file found"), "empty filename": (400, "Empty filename")}
+    rejections = check_upload_rejections(app, user_id)
+    print("\nPOST /upload without a video:")
+    for name, result in rejections.items():
+        rejected = result == expected_rejections[name]
+        failed |= not rejected
+        print(f"  {name:<15} {result[0]} {result[1]}{'' if rejected else '  FAILED'}")
+
+    session_ids, pages = walk_session_pages(app, user_id, args.page_size)
+    with app.app_context():
+        expected_ids = [session_record.id for session_record in VideoSession.query.order_by(VideoSession.created_at.desc(), VideoSession.id.desc())]
+        plan = explain_session_listing(user_id, after)
+    walk_ok = session_ids == expected_ids
+    failed |= not walk_ok
+    print(f"\nlisting walk: {len(session_ids)} sessions in {pages} pages of {args.page_size}, {'ok' if walk_ok else 'WRONG'}")
+    print("listing query plan:")
+    for line in plan:
+        print(f"  {line}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Equivalence check and microbenchmark of the form model scoring backends.
+
+Compares the flat forest export with the pickled sklearn model on probe matrices built from the forest's
+split thresholds (any difference is reported and exits non-zero), then times predict_proba for a single
+shot and for session-sized batches on both backends.
+
+Usage (from the backend folder):
+    python -m video_service.bench_scoring [--rounds N] [--batch-sizes 1 10 50] [--probe-seeds N]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from .forest import FlatForest, SklearnPredictor, build_probe_matrix
+from .scoring import MODEL_FORM, OPT_COLS
+
+
+def check_equivalence(forest, sklearn_predictor, probe_seeds):
+    """
+    Returns number of probe rows whose flat probabilities differ from sklearn's.
+    """
+    mismatched_rows = 0
+    for seed in range(probe_seeds):
+        probe = build_probe_matrix(forest, len(OPT_COLS), seed=seed)
+        flat_proba = forest.predict_proba(probe)
+        sklearn_proba = sklearn_predictor.predict_proba(probe)
+        mismatched_rows += int(np.sum(np.any(flat_proba != sklearn_proba, axis=1)))
+    return mismatched_rows
+
+def time_predict(predict_proba, matrix, rounds):
+    """
+    Returns best-of-rounds seconds per predict_proba call.
+    """
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        predict_proba(matrix)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check and benchmark the form model scoring backends.")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--probe-seeds", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    forest = FlatForest.from_sklearn(MODEL_FORM)
+    if forest is None:
+        print(f"{type(MODEL_FORM).__name__} cannot be flattened, nothing to compare")
+        return 1
+    sklearn_predictor = SklearnPredictor(MODEL_FORM, OPT_COLS)
+
+    mismatched_rows = check_equivalence(forest, sklearn_predictor, args.probe_seeds)
+    print(f"equivalence: {mismatched_rows} of {args.probe_seeds * len(build_probe_matrix(forest, len(OPT_COLS)))} probe rows differ")
+
+    print(f"{'batch':>6} {'sklearn ms':>11} {'flat ms':>9} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        matrix = build_probe_matrix(forest, len(OPT_COLS), num_rows=batch_size)
+        sklearn_time = time_predict(sklearn_predictor.predict_proba, matrix, args.rounds)
+        flat_time = time_predict(forest.predict_proba, matrix, args.rounds)
+        print(f"{batch_size:>6} {sklearn_time * 1000:>11.3f} {flat_time * 1000:>9.3f} {sklearn_time / flat_time:>7.1f}x")
+
+    return 1 if mismatched_rows else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
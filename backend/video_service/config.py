@@ -4,13 +4,34 @@ import os
 BASE_URL = "http://127.0.0.1:8080"
 VIDEO_FOLDER = os.path.join(os.path.dirname(__file__), "videos")
 
+# background processing: worker processes polling the job table, started once per database by the first web
+# process to take its lock
+PROCESSING_WORKERS = 2
+JOB_POLL_INTERVAL = 1.0
+# per-shot analysis processes started by each processing worker
+SHOT_WORKERS = max(1, (os.cpu_count() or 1) // PROCESSING_WORKERS)
+# segment scanners started by each processing worker for long uploads
+DETECTION_WORKERS = SHOT_WORKERS
+# form model predictions: "flat" walks a NumPy export of the forest (checked against sklearn at load time),
+# "sklearn" calls the pickled model directly
+SCORING_BACKEND = "flat"
+# key frames (first frame of each phase): image format ("webp" or "jpg"), its quality, and the longest side in
+# pixels of each variant (frames are never upscaled). *_frame_url point at "full", thumbnail_url at "thumb".
+KEY_FRAME_FORMAT = "webp"
+KEY_FRAME_QUALITY = 80
+KEY_FRAME_SIZES = {"full": 1280, "thumb": 320}
+# session and shot detail responses of complete sessions: serialized bytes kept per web process (LRU), and
+# seconds an entry is served without checking its version in the DB (how long a re-analysis can go unseen)
+DETAIL_CACHE_ENTRIES = 512
+DETAIL_CACHE_TTL = 60
+
 
 OPT_SETTINGS = {
     "opt_S_avg_knee_bend": {"orig": "S_avg_knee_bend", "min": 120, "max": 160},
     "opt_S_avg_body_lean": {"orig": "S_avg_body_lean", "min": -2, "max": 4},
     "opt_S_avg_head_tilt": {"orig": "S_avg_head_tilt", "min": 50, "max": 65},
     "opt_S_avg_elbow_angle": {"orig": "S_avg_elbow_angle", "min": 45, "max": 90},
-    "opt_R_avg_hip_angle": {"orig": "R_avg_hip_angle", "min": 160, "max": 185},
+    "opt_R_avg_hip_angle": {"orig": "R_avg_hip_angle", "min": 160, "max": 180},
 	  "opt_R_avg_elbow_angle": {"orig": "R_avg_elbow_angle", "min": 95, "max": 145},
     "opt_R_avg_knee_bend": {"orig": "R_avg_knee_bend", "min": 154, "max": 166},
     "opt_R_max_wrist_height": {"orig": "R_max_wrist_height", "min": 3.4, "max": 7},
@@ -0,0 +1,196 @@
+"""
+Flat NumPy export of the form model's Random Forest.
+
+At load time every tree of the fitted forest is copied into shared node arrays (feature, threshold,
+children, leaf probabilities), so predict_proba is a vectorized walk of all trees at once, without
+sklearn's per-call input validation and per-tree dispatch. The export is only used if it reproduces
+the sklearn probabilities exactly on a probe matrix; otherwise the sklearn model is used as is.
+"""
+import numpy as np
+
+# rows of the load-time equivalence probe
+PROBE_ROWS = 512
+PROBE_SEED = 0
+
+
+class FlatForest:
+    def __init__(self, feature, threshold, children_left, children_right, leaf_proba, roots, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Exports a fitted single-output RandomForestClassifier (or ExtraTreesClassifier).
+
+        Returns FlatForest, or None if the model is not a forest this export supports.
+        """
+        estimators = getattr(model, "estimators_", None)
+        if not estimators or getattr(model, "n_outputs_", 1) != 1:
+            return None
+
+        n_classes = int(model.n_classes_)
+        feature, threshold, children_left, children_right, leaf_proba, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in estimators:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left < 0
+
+            # leaves point at themselves, so every tree can be walked for the same number of steps
+            children_left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            children_right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            leaf_proba.append(_tree_node_proba(tree.value[:, 0, :n_classes]))
+            roots.append(offset)
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.intp),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            children_left=np.concatenate(children_left).astype(np.intp),
+            children_right=np.concatenate(children_right).astype(np.intp),
+            leaf_proba=np.concatenate(leaf_proba),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max_depth,
+        )
+
+    def apply(self, X):
+        """
+        Walks every tree for every row of X (already float32, in model column order).
+
+        Returns (N_rows, N_trees) array of leaf node indices.
+        """
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+
+        for _ in range(self.max_depth):
+            # float32 input against float64 thresholds, as sklearn's tree compares them
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+
+        return nodes
+
+    def predict_proba(self, X):
+        """
+        Returns (N_rows, N_classes) class probabilities for a (N_rows, N_features) matrix.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        leaves = self.apply(X)
+
+        # accumulate tree by tree, in the order sklearn sums the estimators
+        proba = np.zeros((X.shape[0], self.leaf_proba.shape[1]), dtype=np.float64)
+        for tree_index in range(leaves.shape[1]):
+            proba += self.leaf_proba[leaves[:, tree_index]]
+        proba /= leaves.shape[1]
+
+        return proba
+
+
+class SklearnPredictor:
+    """
+    Calls the sklearn model with a DataFrame of the model columns, as scoring always has.
+    """
+    def __init__(self, model, feature_columns):
+        self.model = model
+        self.feature_columns = feature_columns
+
+    def predict_proba(self, X):
+        # only this (sklearn) path needs pandas, the flat walk runs on the plain NumPy matrix
+        import pandas as pd
+
+        return self.model.predict_proba(pd.DataFrame(X, columns=self.feature_columns))
+
+
+class FlatForestPredictor(SklearnPredictor):
+    """
+    Uses the flat export for finite input and sklearn otherwise (missing values, inputs sklearn rejects).
+    """
+    def __init__(self, model, feature_columns, forest):
+        super().__init__(model, feature_columns)
+        self.forest = forest
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if not np.all(np.abs(X) <= np.finfo(np.float32).max):
+            return super().predict_proba(X)
+        return self.forest.predict_proba(X)
+
+
+def load_predictor(model, feature_columns, backend="flat"):
+    """
+    Builds the predictor for the scoring backend ("flat" or "sklearn"). The flat export is checked against
+    the sklearn model at load time and dropped with a warning if any probability differs.
+
+    Returns object with predict_proba((N_rows, N_features) matrix in feature_columns order).
+    """
+    sklearn_predictor = SklearnPredictor(model, feature_columns)
+    if backend != "flat":
+        return sklearn_predictor
+
+    feature_names = getattr(model, "feature_names_in_", None)
+    if feature_names is not None and list(feature_names) != list(feature_columns):
+        print("Warning: form model columns differ from OPT_COLS, using the sklearn scoring backend")
+        return sklearn_predictor
+
+    forest = FlatForest.from_sklearn(model)
+    if forest is None:
+        print(f"Warning: {type(model).__name__} cannot be flattened, using the sklearn scoring backend")
+        return sklearn_predictor
+
+    probe = build_probe_matrix(forest, len(feature_columns))
+    if not np.array_equal(forest.predict_proba(probe), sklearn_predictor.predict_proba(probe)):
+        print("Warning: flat forest does not match the sklearn model, using the sklearn scoring backend")
+        return sklearn_predictor
+
+    return FlatForestPredictor(model, feature_columns, forest)
+
+def build_probe_matrix(forest, num_features, num_rows=PROBE_ROWS, seed=PROBE_SEED):
+    """
+    Random rows drawn from the split thresholds of each feature (exact ties and both neighbours),
+    so the probe exercises both branches of the splits.
+
+    Returns (num_rows, num_features) float64 matrix.
+    """
+    rng = np.random.default_rng(seed)
+    is_split = forest.children_left != np.arange(len(forest.children_left))
+    probe = rng.normal(0.0, 100.0, size=(num_rows, num_features))
+
+    for feature_index in range(num_features):
+        thresholds = forest.threshold[is_split & (forest.feature == feature_index)]
+        if len(thresholds) == 0:
+            continue
+        candidates = np.concatenate([
+            thresholds,
+            np.nextafter(thresholds.astype(np.float32), np.float32(np.inf)),
+            thresholds - 1.0,
+            thresholds + 1.0,
+        ])
+        probe[:, feature_index] = rng.choice(candidates, size=num_rows)
+
+    return probe
+
+
+# --- PRIVATE / HELPER FUNCTIONS ---
+
+def _tree_node_proba(values):
+    # recent sklearn stores class fractions in tree_.value and returns them as is; older releases stored
+    # weighted counts and normalised them per prediction
+    values = np.asarray(values, dtype=np.float64)
+    totals = values.sum(axis=1)
+    if np.allclose(totals[totals > 0], 1.0):
+        return values.copy()
+
+    totals = totals[:, None]
+    totals[totals == 0.0] = 1.0
+    return values / totals
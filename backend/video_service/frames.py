@@ -0,0 +1,87 @@
+import cv2
+
+# jumps longer than this are done with a seek, shorter ones by grabbing through the frames
+SEEK_MIN_FRAMES = 120
+
+
+def get_frame_skip(actual_fps, target_fps=30):
+    """
+    Gets how many source frames make up one analysed frame when downsampling to target_fps.
+    """
+    frame_rate_ratio = target_fps / actual_fps
+    return int(1 / frame_rate_ratio) if frame_rate_ratio < 1 else 1
+
+
+class FrameSource:
+    """
+    Iterates the kept frames of a video without decoding the ones that are skipped.
+    Skipped frames are only grabbed (no retrieve, so no BGR conversion or copy), and long gaps are seeked over.
+    By default frames are kept on the global frame_skip grid (or one starting at grid_start);
+    keep_frame overrides that with a predicate.
+    """
+
+    def __init__(self, video_path, target_fps=30, start_frame=0, end_frame=None, keep_frame=None, grid_start=0):
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or target_fps
+        self.frame_skip = get_frame_skip(self.fps, target_fps)
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        # container frame count, can be approximate
+        self.frame_count = max(0, int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0))
+        self.end_frame = end_frame
+        self.keep_frame = keep_frame or (lambda frame_index: (frame_index - grid_start) % self.frame_skip == 0)
+
+        # index of the next frame the capture will return
+        self.position = 0
+        if start_frame > 0:
+            self.seek(start_frame)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def __iter__(self):
+        """
+        Yields (frame_index, frame) for every kept frame until end_frame or the end of the video.
+        """
+        while self.end_frame is None or self.position <= self.end_frame:
+            frame_index = self.position
+
+            if not self.keep_frame(frame_index):
+                if not self.cap.grab():
+                    break
+                self.position += 1
+                continue
+
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            self.position += 1
+            yield frame_index, frame
+
+    def expected_kept_frames(self):
+        """
+        Estimates how many frames iteration will yield on the frame_skip grid, from the container frame count.
+        """
+        last_frame = self.frame_count - 1 if self.end_frame is None else min(self.end_frame, self.frame_count - 1)
+        return max(0, (last_frame - self.position) // self.frame_skip + 1)
+
+    def seek(self, frame_index):
+        """
+        Moves to frame_index, seeking for long jumps and grabbing through short ones.
+        """
+        if frame_index < self.position or frame_index - self.position > SEEK_MIN_FRAMES:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            self.position = frame_index
+            return
+
+        while self.position < frame_index and self.cap.grab():
+            self.position += 1
+
+    def release(self):
+        self.cap.release()
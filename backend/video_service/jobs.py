@@ -0,0 +1,211 @@
+import atexit
+import fcntl
+import os
+import threading
+from datetime import datetime, timezone
+
+from flask import Flask
+from sqlalchemy.engine import make_url
+
+from db_schema import ProcessingJob, Session as VideoSession, db
+from .config import JOB_POLL_INTERVAL, PROCESSING_WORKERS
+from .pose import get_pose_pool, get_pose_solution
+from .processes import get_mp_context
+from .scoring import load_models
+from .session_analysis import process_session
+
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+# held open by the web process that runs the pool, so other processes on the same database skip it
+_worker_lock_file = None
+
+
+# --- JOB TABLE HELPERS ---
+
+def enqueue_session_job(session_record):
+    """
+    Adds a processing job for a queued session to the job table.
+
+    Returns the new job record.
+    """
+    job = ProcessingJob(session_id=session_record.id, status="queued", created_at=datetime.now(timezone.utc))
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+def claim_next_job():
+    """
+    Atomically marks the oldest queued job as running for this worker process.
+
+    Returns the claimed job, or None if the queue is empty.
+    """
+    while True:
+        candidate = ProcessingJob.query.filter_by(status="queued").order_by(ProcessingJob.id).first()
+        if candidate is None:
+            return None
+
+        # only one worker can move the row out of "queued", the others retry with the next job
+        claimed = ProcessingJob.query.filter_by(id=candidate.id, status="queued").update(
+            {"status": "running", "worker_pid": os.getpid(), "started_at": datetime.now(timezone.utc)},
+            synchronize_session=False,
+        )
+        db.session.commit()
+
+        if claimed:
+            return db.session.get(ProcessingJob, candidate.id)
+
+def requeue_interrupted_jobs():
+    """
+    Puts jobs back in the queue if the worker process that claimed them is no longer alive.
+    """
+    for job in ProcessingJob.query.filter_by(status="running").all():
+        if not _is_process_alive(job.worker_pid):
+            job.status = "queued"
+            job.worker_pid = None
+    db.session.commit()
+
+def run_job(job):
+    """
+    Processes the session for a claimed job and records the outcome and pose pool metrics on the job row.
+    """
+    session_record = db.session.get(VideoSession, job.session_id)
+    pose_pool = get_pose_pool()
+    pose_pool.take_stats()
+
+    try:
+        process_session(session_record, progress_callback=_make_progress_callback(session_record.id))
+        job.status = "complete"
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+
+    pose_stats = pose_pool.take_stats()
+    job.pose_instances_created = pose_stats["created"]
+    job.pose_instances_reused = pose_stats["reused"]
+    job.pose_construct_seconds = pose_stats["construct_seconds"]
+    job.finished_at = datetime.now(timezone.utc)
+    db.session.commit()
+
+
+# --- WORKER PROCESSES ---
+
+def create_worker_app(database_uri):
+    """
+    Builds a minimal Flask app so worker processes get their own DB engine without importing app.py.
+    """
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+class JobWorkerPool:
+    """
+    Local pool of processing workers that poll the SQLite job table (no external broker).
+    """
+
+    def __init__(self, database_uri, num_workers=PROCESSING_WORKERS):
+        self.database_uri = database_uri
+        self.num_workers = num_workers
+        self._context = get_mp_context()
+        self._stop_event = self._context.Event()
+        self._processes = []
+
+    def start(self):
+        for worker_index in range(self.num_workers):
+            # non-daemon, so workers are allowed to start their own process pools
+            process = self._context.Process(
+                target=_worker_main,
+                args=(self.database_uri, self._stop_event, os.getpid()),
+                name=f"shotsense-worker-{worker_index}",
+            )
+            process.start()
+            self._processes.append(process)
+
+        atexit.register(self.stop)
+
+    def stop(self, timeout=5):
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+def ensure_worker_pool(app):
+    """
+    Starts the worker pool in this web process unless another process on the same database already runs one
+    (an exclusive lock on a file next to the database decides). Called at app creation, so jobs left queued or
+    interrupted by a restart are picked up straight away, and again on upload, so a surviving process takes
+    over if the one running the pool went away.
+
+    Returns the running pool, or None if another process runs it.
+    """
+    global _worker_pool, _worker_lock_file
+
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            database_uri = app.config["SQLALCHEMY_DATABASE_URI"]
+            lock_file = open(_get_worker_lock_path(database_uri), "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                return None
+
+            _worker_lock_file = lock_file
+            with app.app_context():
+                requeue_interrupted_jobs()
+            _worker_pool = JobWorkerPool(database_uri)
+            _worker_pool.start()
+
+    return _worker_pool
+
+
+# --- PRIVATE / HELPER FUNCTIONS ---
+
+def _worker_main(database_uri, stop_event, parent_pid):
+    # a forked copy of the lock would keep it held after the web process exits (e.g. dev server reload)
+    if _worker_lock_file is not None:
+        _worker_lock_file.close()
+
+    app = create_worker_app(database_uri)
+
+    # the web process imports scoring and pose lazily; processing workers load them once, up front,
+    # so the first job does not pay for it and shot pools forked from here inherit them
+    load_models()
+    get_pose_solution()
+
+    # exit with the stop event, or if the web process went away (e.g. dev server reload)
+    while not stop_event.is_set() and os.getppid() == parent_pid:
+        with app.app_context():
+            job = claim_next_job()
+            if job is not None:
+                run_job(job)
+                continue
+
+        stop_event.wait(JOB_POLL_INTERVAL)
+
+def _make_progress_callback(session_id):
+    def report_progress(frames_processed):
+        VideoSession.query.filter_by(id=session_id).update(
+            {"frames_processed": frames_processed, "updated_at": datetime.now(timezone.utc)},
+            synchronize_session=False,
+        )
+        db.session.commit()
+
+    return report_progress
+
+def _get_worker_lock_path(database_uri):
+    return f"{make_url(database_uri).database}.workers.lock"
+
+def _is_process_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,116 @@
+import numpy as np
+
+from .angles import ANGLE_COLUMNS
+from .landmarks import new_landmark_array
+
+# bump when the layout of the saved series changes
+SERIES_FORMAT_VERSION = 1
+
+
+class LandmarkStore:
+    """
+    Per-session cache of the pose results computed while scanning a session for shots.
+    Lets each shot window be analysed from the detection pass instead of running pose estimation a second time.
+    """
+
+    def __init__(self):
+        # frame index -> (landmarks, angles), landmarks/angles are None when no pose was found
+        self._frames = {}
+
+    def __len__(self):
+        return len(self._frames)
+
+    def record(self, frame_index, landmarks=None, angles=None):
+        """
+        Stores the pose result for a processed (non-skipped) frame.
+        """
+        self._frames[frame_index] = (landmarks, angles)
+
+    def records(self):
+        """
+        Returns list of (frame index, landmarks, angles) for every stored frame, in frame order.
+        """
+        return [(frame_index, *self._frames[frame_index]) for frame_index in sorted(self._frames)]
+
+    def window(self, start_frame, end_frame):
+        """
+        Gets the stored frames inside a shot window.
+
+        Returns dict of clip-relative frame index to (landmarks, angles).
+        """
+        return {
+            frame_index - start_frame: self._frames[frame_index]
+            for frame_index in range(start_frame, end_frame + 1)
+            if frame_index in self._frames
+        }
+
+    def save(self, path, **metadata):
+        """
+        Writes the stored series to a compressed npz, one array per column:
+        frame_index, has_pose, landmarks (K, 33, 4 incl. visibility), angles (K, len(angle_columns)) and angle_columns.
+        Frames without a pose keep their row with NaN landmarks/angles. Extra metadata (e.g. shooting_arm) is stored as scalars.
+
+        Returns the path written.
+        """
+        records = self.records()
+        frame_count = len(records)
+
+        frame_index = np.empty(frame_count, dtype=np.int32)
+        has_pose = np.zeros(frame_count, dtype=bool)
+        landmarks = new_landmark_array(frame_count)
+        landmarks.fill(np.nan)
+        angles = np.full((frame_count, len(ANGLE_COLUMNS)), np.nan, dtype=np.float64)
+
+        for row, (index, frame_landmarks, frame_angles) in enumerate(records):
+            frame_index[row] = index
+            if frame_landmarks is not None:
+                has_pose[row] = True
+                landmarks[row] = frame_landmarks
+            if frame_angles is not None:
+                angles[row] = [frame_angles[name] for name in ANGLE_COLUMNS]
+
+        # the kept-frame spacing, so readers can tell where a detection pass skipped a stretch of video
+        frame_skip = int(np.diff(frame_index).min()) if frame_count > 1 else 1
+
+        with open(path, "wb") as file:
+            np.savez_compressed(
+                file,
+                version=SERIES_FORMAT_VERSION,
+                frame_index=frame_index,
+                has_pose=has_pose,
+                landmarks=landmarks,
+                angles=angles,
+                angle_columns=np.array(ANGLE_COLUMNS),
+                frame_skip=frame_skip,
+                **metadata,
+            )
+
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a series written by save().
+
+        Returns (store, metadata dict).
+        """
+        with np.load(path) as series:
+            columns = [str(name) for name in series["angle_columns"]]
+            frame_index = series["frame_index"]
+            has_pose = series["has_pose"]
+            landmarks = series["landmarks"]
+            angles = series["angles"]
+            metadata = {
+                key: series[key].item()
+                for key in series.files
+                if key not in ("frame_index", "has_pose", "landmarks", "angles", "angle_columns")
+            }
+
+        store = cls()
+        for row, index in enumerate(frame_index.tolist()):
+            if not has_pose[row]:
+                store.record(index)
+                continue
+            store.record(index, landmarks[row], {name: angles[row, column] for column, name in enumerate(columns)})
+
+        return store, metadata
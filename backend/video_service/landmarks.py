@@ -0,0 +1,90 @@
+import numpy as np
+
+# --- MEDIAPIPE POSE TOPOLOGY ---
+# Landmarks are kept as (33, 4) float32 arrays (one row per joint), indexed with the constants below
+# so nothing downstream of pose estimation needs the mediapipe package.
+
+NUM_LANDMARKS = 33
+LANDMARK_FIELDS = 4
+X, Y, Z, VISIBILITY = range(LANDMARK_FIELDS)
+
+LEFT_EYE = 2
+RIGHT_EYE = 5
+LEFT_EAR = 7
+RIGHT_EAR = 8
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_ELBOW = 13
+RIGHT_ELBOW = 14
+LEFT_WRIST = 15
+RIGHT_WRIST = 16
+LEFT_INDEX = 19
+RIGHT_INDEX = 20
+LEFT_HIP = 23
+RIGHT_HIP = 24
+LEFT_KNEE = 25
+RIGHT_KNEE = 26
+LEFT_ANKLE = 27
+RIGHT_ANKLE = 28
+LEFT_HEEL = 29
+RIGHT_HEEL = 30
+LEFT_FOOT_INDEX = 31
+RIGHT_FOOT_INDEX = 32
+
+SIDE_LANDMARK_INDICES = {
+    "LEFT": {
+        "shoulder": LEFT_SHOULDER,
+        "elbow": LEFT_ELBOW,
+        "wrist": LEFT_WRIST,
+        "index_finger": LEFT_INDEX,
+        "hip": LEFT_HIP,
+        "knee": LEFT_KNEE,
+        "ankle": LEFT_ANKLE,
+        "eye": LEFT_EYE,
+        "ear": LEFT_EAR,
+    },
+    "RIGHT": {
+        "shoulder": RIGHT_SHOULDER,
+        "elbow": RIGHT_ELBOW,
+        "wrist": RIGHT_WRIST,
+        "index_finger": RIGHT_INDEX,
+        "hip": RIGHT_HIP,
+        "knee": RIGHT_KNEE,
+        "ankle": RIGHT_ANKLE,
+        "eye": RIGHT_EYE,
+        "ear": RIGHT_EAR,
+    },
+}
+
+
+# --- CONVERSION ---
+
+def get_side_indices(shooting_arm):
+    """
+    Returns map of joint name to landmark index for the shooting side (anything but LEFT is treated as RIGHT).
+    """
+    return SIDE_LANDMARK_INDICES["LEFT" if shooting_arm == "LEFT" else "RIGHT"]
+
+def new_landmark_array(num_frames=None):
+    """
+    Allocates an uninitialised float32 landmark buffer, (33, 4) or (num_frames, 33, 4).
+    """
+    shape = (NUM_LANDMARKS, LANDMARK_FIELDS) if num_frames is None else (num_frames, NUM_LANDMARKS, LANDMARK_FIELDS)
+    return np.empty(shape, dtype=np.float32)
+
+def landmarks_to_array(pose_landmarks, out=None, crop_x_offset=0, crop_width=None, frame_width=None):
+    """
+    Copies a MediaPipe landmark list into a (33, 4) float32 array of x, y, z, visibility.
+    If the pose ran on a horizontal crop, x is mapped back to the full frame in one vectorized step.
+
+    Returns the filled array (out, if one was given).
+    """
+    if out is None:
+        out = new_landmark_array()
+    out[:] = [(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_landmarks]
+
+    if crop_width is not None:
+        # float64 maths and a single rounding back to float32, as when the value was written back to the protobuf
+        out[:, X] = (out[:, X].astype(np.float64) * crop_width + crop_x_offset) / frame_width
+
+    return out
@@ -0,0 +1,163 @@
+"""
+Skeleton overlays of the shots.
+
+The frontend draws the skeleton itself over the shot's range of the session upload, from the compact
+per-frame joint and phase stream of build_shot_overlay_data (served by /shots/<id>/overlay).
+
+The annotated shot videos (VIDEO_shot_N.mp4) are kept for clients without it: a shot's video is drawn and
+encoded the first time it is requested, from the session upload and the saved landmark series, and cached
+next to the key frames. Concurrent requests for the same shot (across threads and web processes) are
+coalesced with an exclusive lock file: the first one renders, the others wait on the lock and then serve
+its result.
+"""
+import base64
+import fcntl
+import os
+import re
+
+import numpy as np
+
+from db_schema import Session as VideoSession, ShotAnalysis
+from .analysis import build_overlay_series, get_phase_color, get_skeleton, render_overlay_video
+from .session_analysis import TARGET_FPS, get_session_video_path, get_shot_folder_path, load_session_landmarks
+
+SHOT_FOLDER_PATTERN = re.compile(r"shot_(\d+)")
+# overlay joints are sent as int16 of the normalized coordinates times this (1e-4 of the frame, +-3.2 frames)
+OVERLAY_POINT_SCALE = 10000
+# phases the overlay stream names, a frame's phase is its index here (len = other, -1 = no pose)
+OVERLAY_PHASES = ["Setup", "Release", "Follow-through"]
+
+
+# --- OVERLAY DATA ---
+
+def build_shot_overlay_data(session_record, shot):
+    """
+    Builds the overlay stream of a shot from the saved landmark series: for every frame of the window the
+    analysis processed, its frame index in the session upload, its phase and the skeleton joints, quantized
+    to little-endian int16 and base64 encoded (frames x joints x (x, y)).
+
+    Returns JSON-ready dict, or None if the session has no landmark series.
+    """
+    landmark_store, metadata = load_session_landmarks(session_record.user_id, session_record.hashed_filename, session_record.landmarks_file)
+    if landmark_store is None:
+        return None
+
+    shooting_arm = metadata.get("shooting_arm", session_record.shooting_arm)
+    landmark_frames = landmark_store.window(shot.start_frame, shot.end_frame)
+    frame_indices, phases, points = build_overlay_series(landmark_frames, shooting_arm, target_fps=metadata.get("target_fps", TARGET_FPS))
+
+    pts_to_draw, connections = get_skeleton(shooting_arm)
+    joint_position = {landmark: position for position, landmark in enumerate(pts_to_draw.tolist())}
+
+    return {
+        "shot_id": shot.id,
+        "fps": session_record.fps,
+        "start_frame": shot.start_frame,
+        "end_frame": shot.end_frame,
+        "frame_indices": [shot.start_frame + frame_index for frame_index in frame_indices],
+        "frame_phases": [encode_overlay_phase(phase) for phase in phases],
+        "phases": [{"name": name, "color": to_hex_color(get_phase_color(name))} for name in OVERLAY_PHASES + [None]],
+        "joint_count": len(pts_to_draw),
+        "edges": [[joint_position[start], joint_position[end]] for start, end in connections.tolist()],
+        "point_scale": OVERLAY_POINT_SCALE,
+        "points": encode_overlay_points(points),
+    }
+
+def encode_overlay_phase(phase):
+    if phase is None:
+        return -1
+    return OVERLAY_PHASES.index(phase) if phase in OVERLAY_PHASES else len(OVERLAY_PHASES)
+
+def encode_overlay_points(points):
+    """
+    Returns base64 of the points quantized to little-endian int16 (missing joints as 0).
+    """
+    quantized = np.nan_to_num(np.round(points.astype(np.float64) * OVERLAY_POINT_SCALE), nan=0.0)
+    quantized = np.clip(quantized, np.iinfo(np.int16).min, np.iinfo(np.int16).max).astype("<i2")
+    return base64.b64encode(quantized.tobytes()).decode("ascii")
+
+def to_hex_color(bgr):
+    blue, green, red = bgr
+    return f"#{red:02x}{green:02x}{blue:02x}"
+
+
+# --- ANNOTATED VIDEOS ---
+
+def get_overlay_filename(shot_folder):
+    return f"VIDEO_{shot_folder}.mp4"
+
+def get_overlay_path(user_id, session_hash, shot_index):
+    return os.path.join(get_shot_folder_path(user_id, session_hash, shot_index), get_overlay_filename(f"shot_{shot_index}"))
+
+def ensure_shot_overlay(user_id, session_hash, shot_folder):
+    """
+    Renders the annotated video of a shot unless it is already cached. Must be called inside an app context.
+
+    Returns path of the annotated video, or None if there is no such shot.
+    """
+    match = SHOT_FOLDER_PATTERN.fullmatch(shot_folder)
+    if match is None:
+        return None
+
+    shot_index = int(match.group(1))
+    overlay_path = get_overlay_path(user_id, session_hash, shot_index)
+    if os.path.exists(overlay_path):
+        return overlay_path
+
+    shot = (
+        ShotAnalysis.query.join(VideoSession)
+        .filter(
+            VideoSession.user_id == user_id,
+            VideoSession.hashed_filename == session_hash,
+            ShotAnalysis.shot_index == shot_index,
+        )
+        .first()
+    )
+    if shot is None:
+        return None
+
+    os.makedirs(os.path.dirname(overlay_path), exist_ok=True)
+    with open(f"{overlay_path}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            # a concurrent request may have rendered it while this one waited for the lock
+            if not os.path.exists(overlay_path):
+                render_shot_overlay(shot.session, shot, overlay_path)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    return overlay_path
+
+def render_shot_overlay(session_record, shot, overlay_path):
+    """
+    Draws the shot's window of the session upload from the saved landmark series (pose only runs again for
+    sessions without one). The video is written to a temporary file first, so a cached file is always complete.
+    """
+    user_id = session_record.user_id
+    session_hash = session_record.hashed_filename
+    shooting_arm = session_record.shooting_arm
+
+    landmark_frames = None
+    landmark_store, metadata = load_session_landmarks(user_id, session_hash, session_record.landmarks_file)
+    if landmark_store is not None:
+        landmark_frames = landmark_store.window(shot.start_frame, shot.end_frame)
+        shooting_arm = metadata.get("shooting_arm", shooting_arm)
+
+    rendering_path = f"{os.path.splitext(overlay_path)[0]}.rendering.mp4"
+    try:
+        render_overlay_video(
+            get_session_video_path(user_id, session_hash), shooting_arm, rendering_path,
+            start_frame=shot.start_frame, end_frame=shot.end_frame, landmark_frames=landmark_frames,
+        )
+        os.replace(rendering_path, overlay_path)
+    finally:
+        if os.path.exists(rendering_path):
+            os.remove(rendering_path)
+
+def discard_shot_overlay(user_id, session_hash, shot_index):
+    """
+    Removes a cached annotated video, so the next request renders it again (e.g. after re-analysis).
+    """
+    overlay_path = get_overlay_path(user_id, session_hash, shot_index)
+    if os.path.exists(overlay_path):
+        os.remove(overlay_path)
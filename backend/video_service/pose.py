@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+
+# mediapipe is only imported by the processes that run pose estimation, on first use
+_pose_solution = None
+_pose_solution_lock = threading.Lock()
+
+# pool of the current process (MediaPipe graphs are not shared across forks)
+_pose_pool = None
+_pose_pool_pid = None
+_pose_pool_lock = threading.Lock()
+
+# settings every pose instance of the pipeline is created with
+POSE_SETTINGS = {
+    "static_image_mode": False,
+    "model_complexity": 1,
+    "min_detection_confidence": 0.5,
+    "min_tracking_confidence": 0.5,
+}
+# idle instances kept per settings key
+MAX_IDLE_POSES = 2
+
+
+def get_pose_solution():
+    """
+    Imports mediapipe on first call (thread-safe).
+
+    Returns the mediapipe pose solution module.
+    """
+    global _pose_solution
+
+    if _pose_solution is None:
+        with _pose_solution_lock:
+            if _pose_solution is None:
+                import mediapipe as mp
+                _pose_solution = mp.solutions.pose
+
+    return _pose_solution
+
+def create_pose(**settings):
+    """
+    Creates a MediaPipe pose instance with POSE_SETTINGS, overridden by settings.
+    """
+    return get_pose_solution().Pose(**{**POSE_SETTINGS, **settings})
+
+def new_pose_stats():
+    return {"created": 0, "reused": 0, "construct_seconds": 0.0}
+
+
+class PosePool:
+    """
+    Warm MediaPipe pose instances of one process, keyed by their settings.
+    acquire() hands out an idle instance with its tracking state reset, or builds one (timed in stats),
+    release() gives it back for the next video.
+    """
+
+    def __init__(self, max_idle=MAX_IDLE_POSES):
+        self.max_idle = max_idle
+        self._idle = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+        self._stats = new_pose_stats()
+
+    def acquire(self, **settings):
+        settings = {**POSE_SETTINGS, **settings}
+        key = tuple(sorted(settings.items()))
+
+        with self._lock:
+            idle = self._idle.get(key)
+            pose = idle.pop() if idle else None
+
+        if pose is not None:
+            # clear tracking state left over from the previous video
+            pose.reset()
+            with self._lock:
+                self._stats["reused"] += 1
+        else:
+            start = time.perf_counter()
+            pose = create_pose(**settings)
+            with self._lock:
+                self._stats["created"] += 1
+                self._stats["construct_seconds"] += time.perf_counter() - start
+
+        with self._lock:
+            self._keys[id(pose)] = key
+        return pose
+
+    def release(self, pose):
+        with self._lock:
+            key = self._keys.pop(id(pose), None)
+            if key is not None:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle:
+                    idle.append(pose)
+                    return
+        pose.close()
+
+    def take_stats(self):
+        """
+        Returns the stats collected since the last call, and starts counting again.
+        """
+        with self._lock:
+            stats, self._stats = self._stats, new_pose_stats()
+        return stats
+
+    def add_stats(self, stats):
+        """
+        Adds stats reported by another process (e.g. a detection or shot worker) to this pool's.
+        """
+        with self._lock:
+            for name, value in stats.items():
+                self._stats[name] += value
+
+    def close(self):
+        with self._lock:
+            idle_poses = [pose for poses in self._idle.values() for pose in poses]
+            self._idle = {}
+        for pose in idle_poses:
+            pose.close()
+
+def get_pose_pool():
+    """
+    Returns the pose pool of the current process, created on first use (and again in a forked child).
+    """
+    global _pose_pool, _pose_pool_pid
+
+    with _pose_pool_lock:
+        if _pose_pool is None or _pose_pool_pid != os.getpid():
+            _pose_pool = PosePool()
+            _pose_pool_pid = os.getpid()
+
+    return _pose_pool
@@ -0,0 +1,10 @@
+import multiprocessing
+import os
+
+
+def get_mp_context():
+    """
+    Gets the multiprocessing context used for all worker processes.
+    Fork is preferred so children do not re-import app.py, which resets the database at import time.
+    """
+    return multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
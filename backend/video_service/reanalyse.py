@@ -0,0 +1,235 @@
+"""
+Offline re-analysis of stored sessions from their saved landmark series (LANDMARKS_<hash>.npz).
+
+Replays each series through MultiShotDetector and ShootingAnalyzer and re-scores the session's shots with
+one get_model_feedback_batch call, without decoding video or running pose estimation. Shots whose window is unchanged
+get their metrics, probability and feedback updated (and their cached annotated video discarded, so it is
+rendered again on request); changed windows are only reported, as their key frames would need re-processing.
+
+Usage (from the backend folder):
+    python -m video_service.reanalyse [--dry-run] [--session-id ID ...] [--workers N] [--database-uri URI]
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import selectinload
+
+from db_schema import Session as VideoSession, ShotAnalysis, ShotMetric, db
+from .analysis import analyse_landmark_series
+from .jobs import create_worker_app
+from .overlays import discard_shot_overlay
+from .processes import get_mp_context
+from .scoring import get_model_feedback_batch
+from .session_analysis import (
+    TARGET_FPS,
+    build_feedback_records,
+    detect_shots_from_series,
+    get_feedback_values,
+    get_metric_values,
+    load_session_landmarks,
+)
+
+DEFAULT_DATABASE_URI = f"sqlite:///{os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database.sqlite')}"
+
+
+# --- RE-ANALYSIS ---
+
+def reanalyse_session(session_task):
+    """
+    Process pool entry point: re-runs detection, metrics and scoring for one session's saved series.
+
+    Returns dict with the session id and the recomputed shots (or an error).
+    """
+    session_id, user_id, session_hash, landmarks_file, shooting_arm = session_task
+
+    try:
+        landmark_store, metadata = load_session_landmarks(user_id, session_hash, landmarks_file)
+        if landmark_store is None:
+            return {"session_id": session_id, "error": "landmark series not found"}
+
+        shooting_arm = metadata.get("shooting_arm", shooting_arm)
+        detected_shots = detect_shots_from_series(landmark_store, shooting_arm, frame_skip=metadata.get("frame_skip", 1))
+
+        shot_metrics = []
+        for shot in detected_shots:
+            landmark_frames = landmark_store.window(shot["start_frame"], shot["end_frame"])
+            shot_metrics.append(analyse_landmark_series(landmark_frames, shooting_arm, target_fps=metadata.get("target_fps", TARGET_FPS)))
+
+        shots = []
+        model_feedback = get_model_feedback_batch(shot_metrics)
+        for shot, metrics, (probability, feedback) in zip(detected_shots, shot_metrics, model_feedback):
+            shots.append({
+                "start_frame": shot["start_frame"],
+                "end_frame": shot["end_frame"],
+                "metrics": metrics,
+                "probability": float(probability) if probability is not None else None,
+                "feedback": feedback,
+            })
+
+        return {"session_id": session_id, "shots": shots}
+    except Exception as e:
+        return {"session_id": session_id, "error": str(e)}
+
+def diff_shot(shot_record, shot_result):
+    """
+    Compares a stored shot with its recomputed result, in the form the rows are stored.
+
+    Returns dict of field name (metrics, make_probability, feedback) to (old, new) for the fields that changed.
+    """
+    old_values = {
+        "metrics": {record.metric: record.get_value() for record in shot_record.metrics},
+        "make_probability": shot_record.make_probability,
+        "feedback": [(record.feature, record.direction, record.score) for record in shot_record.feedback],
+    }
+    new_values = {
+        "metrics": dict(get_metric_values(shot_result["metrics"])),
+        "make_probability": shot_result["probability"],
+        "feedback": get_feedback_values(shot_result["feedback"]),
+    }
+
+    return {field: (old_values[field], new_value) for field, new_value in new_values.items() if old_values[field] != new_value}
+
+def update_metric_records(shot_record, metrics):
+    """
+    Updates the stored metric rows of a shot in place (a metric keeps its row, as (shot, metric) is unique).
+    """
+    metric_values = dict(get_metric_values(metrics))
+    stored_records = {record.metric: record for record in shot_record.metrics}
+
+    for metric, record in stored_records.items():
+        if metric not in metric_values:
+            shot_record.metrics.remove(record)
+    for metric, value in metric_values.items():
+        if metric in stored_records:
+            stored_records[metric].value = value
+            stored_records[metric].is_integer = isinstance(value, int)
+        else:
+            shot_record.metrics.append(ShotMetric(metric=metric, value=value, is_integer=isinstance(value, int)))
+
+def apply_session_result(session_record, session_result, dry_run=False):
+    """
+    Matches recomputed shots to stored ones by window and updates the changed columns (unless dry_run).
+
+    Returns report dict with updated, unchanged, failed and window-changed shots.
+    """
+    stored_shots = {(shot.start_frame, shot.end_frame): shot for shot in session_record.shots}
+    new_shots = {(shot["start_frame"], shot["end_frame"]): shot for shot in session_result["shots"]}
+
+    report = {"updated": [], "unchanged": 0, "failed": [], "windows_removed": [], "windows_added": []}
+
+    for window, shot_result in new_shots.items():
+        shot_record = stored_shots.get(window)
+        if shot_record is None:
+            report["windows_added"].append(window)
+            continue
+        if shot_result["probability"] is None:
+            report["failed"].append(shot_record.id)
+            continue
+
+        changes = diff_shot(shot_record, shot_result)
+        if not changes:
+            report["unchanged"] += 1
+            continue
+
+        report["updated"].append((shot_record.id, changes))
+        if not dry_run:
+            if "metrics" in changes:
+                update_metric_records(shot_record, shot_result["metrics"])
+            if "make_probability" in changes:
+                shot_record.make_probability = shot_result["probability"]
+            if "feedback" in changes:
+                shot_record.feedback = build_feedback_records(shot_result["feedback"])
+            # metric and feedback changes only touch child rows, so the shot's version (its ETag) is bumped here
+            shot_record.updated_at = datetime.now(timezone.utc)
+            discard_shot_overlay(session_record.user_id, session_record.hashed_filename, shot_record.shot_index)
+
+    report["windows_removed"] = [window for window in stored_shots if window not in new_shots]
+    if report["updated"] and not dry_run:
+        # the session detail embeds its shots, so its ETag must change too
+        session_record.updated_at = datetime.now(timezone.utc)
+    return report
+
+def reanalyse_sessions(session_ids=None, workers=None, dry_run=False):
+    """
+    Re-analyses every complete session with a saved series (or only session_ids) across a process pool.
+    Must be called inside an app context.
+
+    Returns dict of session id to report.
+    """
+    # every stored shot is diffed, metric and feedback rows included
+    query = VideoSession.query.filter(VideoSession.status == "complete", VideoSession.landmarks_file.isnot(None)).options(
+        selectinload(VideoSession.shots).selectinload(ShotAnalysis.metrics),
+        selectinload(VideoSession.shots).selectinload(ShotAnalysis.feedback),
+    )
+    if session_ids:
+        query = query.filter(VideoSession.id.in_(session_ids))
+    session_records = {session_record.id: session_record for session_record in query.all()}
+
+    session_tasks = [
+        (session_record.id, session_record.user_id, session_record.hashed_filename, session_record.landmarks_file, session_record.shooting_arm)
+        for session_record in session_records.values()
+    ]
+
+    reports = {}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=get_mp_context()) as executor:
+        for session_result in executor.map(reanalyse_session, session_tasks):
+            session_id = session_result["session_id"]
+            if "error" in session_result:
+                reports[session_id] = {"error": session_result["error"]}
+                continue
+            reports[session_id] = apply_session_result(session_records[session_id], session_result, dry_run)
+
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+
+    return reports
+
+
+# --- CLI ---
+
+def print_report(reports, dry_run=False):
+    updated_count = 0
+    for session_id, report in sorted(reports.items()):
+        if "error" in report:
+            print(f"session {session_id}: error: {report['error']}")
+            continue
+
+        updated_count += len(report["updated"])
+        print(
+            f"session {session_id}: {len(report['updated'])} changed, {report['unchanged']} unchanged, "
+            f"{len(report['windows_added'])} new windows, {len(report['windows_removed'])} missing windows"
+        )
+        for shot_id, changes in report["updated"]:
+            for field, (old_value, new_value) in changes.items():
+                print(f"  shot {shot_id} {field}:\n    - {old_value}\n    + {new_value}")
+        for shot_id in report["failed"]:
+            print(f"  shot {shot_id}: model prediction failed, left as is")
+        for start_frame, end_frame in report["windows_added"]:
+            print(f"  new window {start_frame}-{end_frame} (not stored, needs re-processing)")
+        for start_frame, end_frame in report["windows_removed"]:
+            print(f"  window {start_frame}-{end_frame} no longer detected (left as is)")
+
+    action = "would be updated" if dry_run else "updated"
+    print(f"{len(reports)} sessions re-analysed, {updated_count} shots {action}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-analyse stored sessions from their saved landmark series.")
+    parser.add_argument("--dry-run", action="store_true", help="print the differences without writing them")
+    parser.add_argument("--session-id", type=int, action="append", dest="session_ids", help="only this session (repeatable)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--database-uri", default=DEFAULT_DATABASE_URI)
+    args = parser.parse_args(argv)
+
+    app = create_worker_app(args.database_uri)
+    with app.app_context():
+        reports = reanalyse_sessions(args.session_ids, args.workers, args.dry_run)
+
+    print_report(reports, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
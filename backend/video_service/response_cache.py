@@ -0,0 +1,57 @@
+"""
+In-process LRU of serialized responses, in front of the DB for the session and shot detail endpoints.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from .config import DETAIL_CACHE_ENTRIES, DETAIL_CACHE_TTL
+
+
+class ResponseCache:
+    """
+    In-process LRU of serialized detail responses, keyed by resource (e.g. ("shot", 12)).
+    Each entry keeps the owner, the ETag it was built for and the response bytes. Within ttl seconds of being
+    stored (or last revalidated) an entry is served as is; after that only if the caller's current ETag matches.
+    """
+
+    def __init__(self, max_entries=DETAIL_CACHE_ENTRIES, ttl=DETAIL_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, user_id, etag=None):
+        """
+        Looks up a response of user_id. Without etag, only entries still within ttl are returned; with it,
+        an entry built for that ETag is returned and its ttl starts again.
+
+        Returns (etag, body bytes), or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["user_id"] != user_id:
+                return None
+
+            if etag is None:
+                if time.monotonic() - entry["checked_at"] > self.ttl:
+                    return None
+            elif entry["etag"] != etag:
+                del self._entries[key]
+                return None
+            else:
+                entry["checked_at"] = time.monotonic()
+
+            self._entries.move_to_end(key)
+            return entry["etag"], entry["body"]
+
+    def put(self, key, user_id, etag, body):
+        with self._lock:
+            self._entries[key] = {"user_id": user_id, "etag": etag, "body": body, "checked_at": time.monotonic()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -1,20 +1,38 @@
+import gzip
+import hashlib
 import json
 import os
+from datetime import datetime
 
-from flask import jsonify, request, send_from_directory, session
+from flask import current_app, jsonify, request, send_from_directory, session
 
-from db_schema import Session as VideoSession, ShotAnalysis
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import selectinload
+
+from db_schema import Session as VideoSession, ShotAnalysis, ShotMetric, db
 
 from .config import OPT_SETTINGS, VIDEO_FOLDER
+from .jobs import enqueue_session_job, ensure_worker_pool
 from .metric_explanations import METRIC_EXPLANATIONS
-from .scoring import parse_metric
-from .session_analysis import process_session_upload
+from .overlays import build_shot_overlay_data, ensure_shot_overlay, get_overlay_filename
+from .response_cache import ResponseCache
+from .scoring import build_feedback_item, parse_metric
+from .session_analysis import create_session_upload
 
 METRIC_EXPLANATIONS_MAP = {
     parse_metric(metric_key): explanation
     for metric_key, explanation in METRIC_EXPLANATIONS.items()
 }
 
+# /sessions page size when no limit is given, and the largest accepted
+SESSIONS_PAGE_SIZE = 20
+MAX_SESSIONS_PAGE_SIZE = 100
+SESSION_STATUSES = {"queued", "processing", "complete", "failed"}
+# part of every detail ETag, bump it when the session or shot detail serializers change
+DETAIL_FORMAT_VERSION = 3
+# serialized /sessions/<id> and /shots/<id> responses of complete sessions
+DETAIL_CACHE = ResponseCache()
+
 METRIC_RANGES_MAP = {
     parse_metric(settings["orig"]): {
         "min": settings.get("min"),
@@ -25,6 +43,16 @@ METRIC_RANGES_MAP = {
     if settings.get("orig")
 }
 
+# explanations and optimal ranges of the metrics, served once by /metrics/metadata; shot responses only
+# carry the version, a hash of the content, so a changed map gets a new URL (?v=) in browser caches
+METRIC_METADATA = {
+    "explanations": METRIC_EXPLANATIONS_MAP,
+    "ranges": METRIC_RANGES_MAP,
+}
+METRIC_METADATA_VERSION = hashlib.sha256(json.dumps(METRIC_METADATA, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+# max-age of the versioned /metrics/metadata URL (a year, as for any immutable asset)
+METRIC_METADATA_MAX_AGE = 365 * 24 * 3600
+
 
 # ==================
 # ROUTES / ENDPOINTS
@@ -41,17 +69,19 @@ def upload_session_video():
     shooting_arm = request.form.get("shootingArm", "RIGHT")
 
     try:
-        # process uploaded session video
-        session_record = process_session_upload(file=file, user_id=user_id, shooting_arm=shooting_arm)
+        # save upload and queue it for the background workers
+        session_record = create_session_upload(file=file, user_id=user_id, shooting_arm=shooting_arm)
+        enqueue_session_job(session_record)
+        ensure_worker_pool(current_app._get_current_object())
 
         return jsonify(
             {
-                "message": "Session analysis complete",
+                "message": "Session queued for analysis",
                 "session_id": session_record.id,
                 "status": session_record.status,
-                "shot_count": session_record.shot_count,
+                "status_url": f"/sessions/{session_record.id}/status",
             }
-        ), 200
+        ), 202
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -61,14 +91,26 @@ def get_sessions():
     if user_id is None:
         return jsonify({"error": "Unauthorised"}), 401
 
-    user_sessions = (
-        VideoSession.query.filter_by(user_id=user_id)
-        .order_by(VideoSession.created_at.desc())
-        .all()
-    )
+    listing_args = get_session_listing_args()
+    if isinstance(listing_args, tuple):
+        return listing_args
+
+    # one extra row tells whether there is a next page
+    limit = listing_args.pop("limit")
+    summaries = query_session_summaries(user_id, limit=limit + 1, **listing_args)
+    next_cursor = None
+    if len(summaries) > limit:
+        summaries = summaries[:limit]
+        next_cursor = build_session_cursor(summaries[-1][0])
 
     return jsonify(
-        [serialize_session_summary(session_record) for session_record in user_sessions]
+        {
+            "sessions": [
+                serialize_session_summary(session_record, preview_shot)
+                for session_record, preview_shot in summaries
+            ],
+            "next_cursor": next_cursor,
+        }
     ), 200
 
 
@@ -77,11 +119,34 @@ def get_session(session_id):
     if user_id is None:
         return jsonify({"error": "Unauthorised"}), 401
 
+    def load_version():
+        return (
+            db.session.query(VideoSession.updated_at, VideoSession.status)
+            .filter_by(id=session_id, user_id=user_id)
+            .first()
+        )
+
+    def load_payload():
+        session_record = (
+            VideoSession.query.filter_by(id=session_id, user_id=user_id)
+            .options(selectinload(VideoSession.shots))
+            .first()
+        )
+        return serialize_session_detail(session_record) if session_record else None
+
+    return serve_cached_detail(("session", session_id), user_id, load_version, load_payload, "Session not found")
+
+
+def get_session_status(session_id):
+    user_id = get_current_user_id()
+    if user_id is None:
+        return jsonify({"error": "Unauthorised"}), 401
+
     session_record = VideoSession.query.filter_by(id=session_id, user_id=user_id).first()
     if not session_record:
         return jsonify({"error": "Session not found"}), 404
 
-    return jsonify(serialize_session_detail(session_record)), 200
+    return jsonify(serialize_session_status(session_record)), 200
 
 
 def get_shot(shot_id):
@@ -89,6 +154,37 @@ def get_shot(shot_id):
     if user_id is None:
         return jsonify({"error": "Unauthorised"}), 401
 
+    def load_version():
+        return (
+            db.session.query(ShotAnalysis.updated_at, VideoSession.status)
+            .join(VideoSession)
+            .filter(
+                ShotAnalysis.id == shot_id,
+                VideoSession.user_id == user_id,
+            )
+            .first()
+        )
+
+    def load_payload():
+        shot = (
+            ShotAnalysis.query.join(VideoSession)
+            .filter(
+                ShotAnalysis.id == shot_id,
+                VideoSession.user_id == user_id,
+            )
+            .options(selectinload(ShotAnalysis.metrics), selectinload(ShotAnalysis.feedback))
+            .first()
+        )
+        return serialize_shot_detail(shot) if shot else None
+
+    return serve_cached_detail(("shot", shot_id), user_id, load_version, load_payload, "Shot analysis not found")
+
+
+def get_shot_overlay(shot_id):
+    user_id = get_current_user_id()
+    if user_id is None:
+        return jsonify({"error": "Unauthorised"}), 401
+
     shot = (
         ShotAnalysis.query.join(VideoSession)
         .filter(
@@ -101,7 +197,37 @@ def get_shot(shot_id):
     if not shot:
         return jsonify({"error": "Shot analysis not found"}), 404
 
-    return jsonify(serialize_shot_detail(shot)), 200
+    overlay_data = build_shot_overlay_data(shot.session, shot)
+    if overlay_data is None:
+        return jsonify({"error": "No overlay data for this shot"}), 404
+
+    return build_compressed_json_response(overlay_data), 200
+
+
+def get_metric_trends():
+    user_id = get_current_user_id()
+    if user_id is None:
+        return jsonify({"error": "Unauthorised"}), 401
+
+    metrics = request.args.getlist("metric")
+    return jsonify({"sessions": query_metric_trends(user_id, metrics)}), 200
+
+
+def get_metric_metadata():
+    if METRIC_METADATA_VERSION in request.if_none_match:
+        response, status = current_app.response_class(), 304
+    else:
+        response, status = build_compressed_json_response({"version": METRIC_METADATA_VERSION, **METRIC_METADATA}), 200
+
+    response.set_etag(METRIC_METADATA_VERSION)
+    response.cache_control.public = True
+    # only the URL of the current version never changes, an unversioned or stale one must revalidate
+    if request.args.get("v") == METRIC_METADATA_VERSION:
+        response.cache_control.max_age = METRIC_METADATA_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response, status
 
 
 def serve_video(user_id, hash_name, filename):
@@ -115,6 +241,15 @@ def serve_session_video(user_id, session_hash, filename):
 
 
 def serve_shot_video(user_id, session_hash, shot_folder, filename):
+    # annotated videos are rendered on their first request and served from disk afterwards
+    if filename == get_overlay_filename(shot_folder):
+        try:
+            overlay_path = ensure_shot_overlay(user_id, session_hash, shot_folder)
+        except Exception as e:
+            return jsonify({"error": f"Could not render shot video: {e}"}), 500
+        if overlay_path is None:
+            return jsonify({"error": "Shot not found"}), 404
+
     directory = os.path.join(
         VIDEO_FOLDER,
         str(user_id),
@@ -129,8 +264,7 @@ def serve_shot_video(user_id, session_hash, shot_folder, filename):
 # ==================
 # SERIALIZERS
 # ==================
-def serialize_session_summary(session_record):
-    first_shot = session_record.shots[0] if session_record.shots else None
+def serialize_session_summary(session_record, first_shot=None):
     return {
         "id": session_record.id,
         "created_at": session_record.created_at.isoformat(),
@@ -139,6 +273,18 @@ def serialize_session_summary(session_record):
         "original_video_url": session_record.original_video_url,
         "preview_shot_id": first_shot.id if first_shot else None,
         "preview_video_url": first_shot.video_url if first_shot else None,
+        "preview_thumbnail_url": first_shot.thumbnail_url if first_shot else None,
+    }
+
+
+def serialize_session_status(session_record):
+    return {
+        "id": session_record.id,
+        "status": session_record.status,
+        "frames_processed": session_record.frames_processed,
+        "total_frames": session_record.total_frames,
+        "shot_count": session_record.shot_count,
+        "processing_error": session_record.processing_error,
     }
 
 
@@ -151,6 +297,8 @@ def serialize_session_detail(session_record):
         "shot_count": session_record.shot_count,
         "original_video_url": session_record.original_video_url,
         "total_frames": session_record.total_frames,
+        "fps": session_record.fps,
+        "frames_processed": session_record.frames_processed,
         "processing_error": session_record.processing_error,
         "shots": [serialize_shot_summary(shot) for shot in session_record.shots],
     }
@@ -162,33 +310,39 @@ def serialize_shot_summary(shot):
         "shot_index": shot.shot_index,
         "start_frame": shot.start_frame,
         "end_frame": shot.end_frame,
+        "start_time": shot.start_time,
+        "end_time": shot.end_time,
         "video_url": shot.video_url,
         "original_video_url": shot.original_video_url,
         "setup_frame_url": shot.setup_frame_url,
         "release_frame_url": shot.release_frame_url,
         "follow_frame_url": shot.follow_frame_url,
+        "thumbnail_url": shot.thumbnail_url,
         "make_probability": shot.make_probability,
         "created_at": shot.created_at.isoformat(),
     }
 
 
 def serialize_shot_detail(shot):
+    metrics = {record.metric: record.get_value() for record in shot.metrics}
     return {
         "id": shot.id,
         "session_id": shot.session_id,
         "shot_index": shot.shot_index,
         "start_frame": shot.start_frame,
         "end_frame": shot.end_frame,
+        "start_time": shot.start_time,
+        "end_time": shot.end_time,
         "video_url": shot.video_url,
         "original_video_url": shot.original_video_url,
         "setup_frame_url": shot.setup_frame_url,
         "release_frame_url": shot.release_frame_url,
         "follow_frame_url": shot.follow_frame_url,
-        "metrics": json.loads(shot.metrics_json),
-        "metric_explanations": get_metric_explanations(),
-        "metric_ranges": get_metric_ranges(),
+        "thumbnail_url": shot.thumbnail_url,
+        "metrics": {parse_metric(metric): value for metric, value in metrics.items()},
+        "metric_metadata_version": METRIC_METADATA_VERSION,
         "make_probability": shot.make_probability,
-        "form_feedback": json.loads(shot.form_feedback_json),
+        "form_feedback": [build_feedback_item(record.feature, record.score, record.direction, metrics) for record in shot.feedback],
         "created_at": shot.created_at.isoformat(),
     }
 
@@ -211,9 +365,214 @@ def get_uploaded_video_file():
     return file
 
 
-def get_metric_explanations():
-    return METRIC_EXPLANATIONS_MAP
+def get_session_listing_args():
+    """
+    Parses the /sessions query string: after=<created_at>,<id> (the next_cursor of the previous page), limit,
+    status (comma-separated) and from/to (ISO dates or datetimes on created_at, from inclusive, to exclusive).
+
+    Returns dict of query_session_summaries arguments, or an error response tuple.
+    """
+    try:
+        limit = int(request.args.get("limit", SESSIONS_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 1 <= limit <= MAX_SESSIONS_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {MAX_SESSIONS_PAGE_SIZE}"}), 400
+
+    after = None
+    if request.args.get("after"):
+        try:
+            created_at, session_id = request.args["after"].rsplit(",", 1)
+            after = (datetime.fromisoformat(created_at), int(session_id))
+        except ValueError:
+            return jsonify({"error": "after must be <created_at>,<id> as given by next_cursor"}), 400
+
+    statuses = None
+    if request.args.get("status"):
+        statuses = request.args["status"].split(",")
+        if not set(statuses) <= SESSION_STATUSES:
+            return jsonify({"error": f"status must be one of {', '.join(sorted(SESSION_STATUSES))}"}), 400
+
+    created_range = {}
+    for name in ("from", "to"):
+        if request.args.get(name):
+            try:
+                created_range[name] = datetime.fromisoformat(request.args[name])
+            except ValueError:
+                return jsonify({"error": f"{name} must be an ISO date or datetime"}), 400
+
+    return {
+        "limit": limit,
+        "after": after,
+        "statuses": statuses,
+        "created_from": created_range.get("from"),
+        "created_to": created_range.get("to"),
+    }
+
+
+def build_session_cursor(session_record):
+    return f"{session_record.created_at.isoformat()},{session_record.id}"
+
+
+def query_session_summaries(user_id, limit=None, after=None, statuses=None, created_from=None, created_to=None):
+    """
+    Loads a page of a user's sessions with the few columns of their first shot the listing shows, in one
+    query (the shot collections and their JSON blobs are never loaded). Sessions are ordered newest first by
+    (created_at, id); after=(created_at, id) continues below that key, so a page is an index range scan on
+    ix_sessions_user_created whatever its depth. created_from/created_to bound created_at (inclusive/exclusive).
+
+    Returns list of (session record, preview row with id/video_url/thumbnail_url, or None).
+    """
+    # the first shot of each joined session, found through ix_shot_analyses_session_shot
+    first_shot_index = (
+        select(func.min(ShotAnalysis.shot_index))
+        .where(ShotAnalysis.session_id == VideoSession.id)
+        .correlate(VideoSession)
+        .scalar_subquery()
+    )
+
+    query = (
+        db.session.query(VideoSession, ShotAnalysis.id, ShotAnalysis.video_url, ShotAnalysis.thumbnail_url)
+        .outerjoin(
+            ShotAnalysis,
+            and_(
+                ShotAnalysis.session_id == VideoSession.id,
+                ShotAnalysis.shot_index == first_shot_index,
+            ),
+        )
+        .filter(VideoSession.user_id == user_id)
+    )
+
+    if after is not None:
+        after_created_at, after_id = after
+        query = query.filter(
+            or_(
+                VideoSession.created_at < after_created_at,
+                and_(VideoSession.created_at == after_created_at, VideoSession.id < after_id),
+            )
+        )
+    if statuses:
+        query = query.filter(VideoSession.status.in_(statuses))
+    if created_from is not None:
+        query = query.filter(VideoSession.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(VideoSession.created_at < created_to)
+
+    query = query.order_by(VideoSession.created_at.desc(), VideoSession.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+
+    # the row's id/video_url/thumbnail_url are the preview shot's
+    return [(row[0], row if row.id is not None else None) for row in query.all()]
+
+
+def query_metric_trends(user_id, metrics=None):
+    """
+    Averages every metric (or only the given raw metric keys) over the shots of each of the user's
+    complete sessions, in SQL.
+
+    Returns list of per-session dicts (oldest first) with the averages by display name.
+    """
+    query = (
+        db.session.query(
+            VideoSession.id,
+            VideoSession.created_at,
+            ShotMetric.metric,
+            func.avg(ShotMetric.value),
+            func.count(ShotMetric.value),
+        )
+        .join(ShotAnalysis, ShotAnalysis.session_id == VideoSession.id)
+        .join(ShotMetric, ShotMetric.shot_id == ShotAnalysis.id)
+        .filter(VideoSession.user_id == user_id, VideoSession.status == "complete")
+        .group_by(VideoSession.id, ShotMetric.metric)
+        .order_by(VideoSession.created_at, VideoSession.id)
+    )
+    if metrics:
+        query = query.filter(ShotMetric.metric.in_(metrics))
+
+    trends = {}
+    for session_id, created_at, metric, average, shot_count in query.all():
+        session_trend = trends.setdefault(session_id, {"session_id": session_id, "created_at": created_at.isoformat(), "metrics": {}})
+        session_trend["metrics"][parse_metric(metric)] = {"average": average, "shot_count": shot_count}
+
+    return list(trends.values())
+
+
+def build_compressed_json_response(payload):
+    # gzip the body when the client accepts it (the overlay stream is mostly base64 of small integers)
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    response = current_app.response_class(mimetype="application/json")
+    response.vary.add("Accept-Encoding")
+
+    if "gzip" in request.accept_encodings:
+        body = gzip.compress(body, compresslevel=6)
+        response.headers["Content-Encoding"] = "gzip"
+
+    response.set_data(body)
+    return response
+
+
+def serve_cached_detail(cache_key, user_id, load_version, load_payload, not_found_message):
+    """
+    Serves a detail resource with a strong ETag of its row version, answering a matching If-None-Match
+    with 304. Browsers must revalidate every time (no-cache), as re-analysis rewrites complete sessions
+    offline. Responses of complete sessions are kept in DETAIL_CACHE: within the cache's ttl they are served
+    without touching the DB, after it only the version is re-read. Others (still processing, so their rows
+    change) are built on every request.
+
+    load_version() returns the (updated_at, session status) row or None, load_payload() the serialized dict
+    or None.
+
+    Returns (response, status).
+    """
+    cached = DETAIL_CACHE.get(cache_key, user_id)
+    if cached is not None:
+        return build_detail_response(*cached)
+
+    version = load_version()
+    if version is None:
+        return jsonify({"error": not_found_message}), 404
+
+    updated_at, status = version
+    complete = status == "complete"
+    etag = build_detail_etag(cache_key, updated_at)
+
+    cached = DETAIL_CACHE.get(cache_key, user_id, etag) if complete else None
+    if cached is not None:
+        return build_detail_response(*cached)
+    if etag in request.if_none_match:
+        return build_detail_response(etag, None)
+
+    payload = load_payload()
+    if payload is None:
+        return jsonify({"error": not_found_message}), 404
+
+    # same encoding as jsonify
+    body = current_app.json.dumps(payload).encode("utf-8")
+    if complete:
+        DETAIL_CACHE.put(cache_key, user_id, etag, body)
+    return build_detail_response(etag, body)
+
+
+def build_detail_etag(cache_key, updated_at):
+    kind, resource_id = cache_key
+    version = updated_at.isoformat() if updated_at else "0"
+    # shot details embed the metric metadata version
+    return f"{kind}-{resource_id}-{version}-v{DETAIL_FORMAT_VERSION}-{METRIC_METADATA_VERSION}"
+
+
+def build_detail_response(etag, body):
+    """
+    Returns (response, status): 304 without a body if the client already has etag, else 200 with body.
+    """
+    response = current_app.response_class(mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+
+    if etag in request.if_none_match:
+        return response, 304
 
+    response.set_data(body)
+    return response, 200
 
-def get_metric_ranges():
-    return METRIC_RANGES_MAP
@@ -1,41 +1,169 @@
 import os
+import threading
 
-import joblib
 import numpy as np
-import pandas as pd
 
-from .config import FEEDBACK_COLS, FEEDBACK_MESSAGES, OPT_SETTINGS
+from .config import FEEDBACK_COLS, FEEDBACK_MESSAGES, OPT_SETTINGS, SCORING_BACKEND
 
 
 MODEL_FOLDER = os.path.join(os.path.dirname(__file__), "model")
 
-MODEL_FORM = joblib.load(os.path.join(MODEL_FOLDER, "model_form_6_scale.pkl"))
-OPT_COLS = joblib.load(os.path.join(MODEL_FOLDER, "opt_cols_v3.pkl"))
-ALL_OPT_COLS = joblib.load(os.path.join(MODEL_FOLDER, "all_opt_cols.pkl"))
+# MODEL_FORM, OPT_COLS, ALL_OPT_COLS and FORM_PREDICTOR are loaded on first use (see load_models), so
+# importing scoring (e.g. for parse_metric in the web process) does not deserialize the model
+_LAZY_MODEL_ATTRIBUTES = ("MODEL_FORM", "OPT_COLS", "ALL_OPT_COLS", "FORM_PREDICTOR")
+_models = None
+_models_lock = threading.Lock()
+
+
+def load_models():
+  """
+  Loads the form model and its column lists on first call (thread-safe), with the index maps scoring needs.
+
+  Returns dict of the loaded objects.
+  """
+  global _models
+
+  if _models is None:
+    with _models_lock:
+      if _models is None:
+        import joblib
+        from .forest import load_predictor
+
+        model_form = joblib.load(os.path.join(MODEL_FOLDER, "model_form_6_scale.pkl"))
+        opt_cols = joblib.load(os.path.join(MODEL_FOLDER, "opt_cols_v3.pkl"))
+        all_opt_cols = joblib.load(os.path.join(MODEL_FOLDER, "all_opt_cols.pkl"))
+        all_opt_index = {opt_col: column for column, opt_col in enumerate(all_opt_cols)}
+
+        _models = {
+          "MODEL_FORM": model_form,
+          "OPT_COLS": opt_cols,
+          "ALL_OPT_COLS": all_opt_cols,
+          "FORM_PREDICTOR": load_predictor(model_form, opt_cols, SCORING_BACKEND),
+          "model_columns": [all_opt_index[opt_col] for opt_col in opt_cols],
+          "feedback_columns": [all_opt_index[opt_col] for opt_col in FEEDBACK_COLS],
+        }
+
+  return _models
+
+
+def __getattr__(name):
+  if name in _LAZY_MODEL_ATTRIBUTES:
+    return load_models()[name]
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# --- VECTORIZED SCORING ENGINE ---
+# every scored feature is an (orig metric, min, max) row of OPT_SETTINGS, so a whole batch of shots
+# is scored against the min/max vectors in one step
+
+SCORED_FEATURES = [opt_col for opt_col, settings in OPT_SETTINGS.items() if settings.get("orig")]
+OPT_MIN = np.array([OPT_SETTINGS[opt_col]["min"] for opt_col in SCORED_FEATURES], dtype=np.float64)
+OPT_MAX = np.array([OPT_SETTINGS[opt_col]["max"] for opt_col in SCORED_FEATURES], dtype=np.float64)
+
+# raw metrics read into the feature matrix: the scored ones, then the extras the "A_" (all phases) rules need
+HEAD_TILT_METRICS = ["S_avg_head_tilt", "R_avg_head_tilt", "F_head_tilt"]
+INPUT_METRICS = list(dict.fromkeys(
+  [OPT_SETTINGS[opt_col]["orig"] for opt_col in SCORED_FEATURES]
+  + ["S_avg_knee_bend", "R_avg_knee_bend"]
+  + HEAD_TILT_METRICS
+))
+_INPUT_INDEX = {metric: column for column, metric in enumerate(INPUT_METRICS)}
+_SCORED_INPUT_COLUMNS = [_INPUT_INDEX[OPT_SETTINGS[opt_col]["orig"]] for opt_col in SCORED_FEATURES]
+
+
+# sklearn validates the model input as float32, so penalties beyond its range fail the prediction
+_MAX_MODEL_VALUE = np.finfo(np.float32).max
 
 
 def get_model_feedback(features):
+  return get_model_feedback_batch([features])[0]
+
+
+def get_model_feedback_batch(metric_dicts, top_n=5):
+  """
+  Scores every shot of a batch (e.g. a session) with a single predict_proba call.
+  A shot with missing or out-of-range metrics fails on its own, without failing the rest of the batch.
+
+  Returns list of (probability, feedback list) per shot, (None, None) for the shots that failed.
+  """
+  results = [(None, None)] * len(metric_dicts)
+
   try:
-    df_orig = pd.DataFrame([features])
+    models = load_models()
+    feature_matrix, has_metrics = build_feature_matrix(metric_dicts)
+    opt_matrix = generate_opt_matrix(feature_matrix)
+
+    model_matrix = opt_matrix[:, models["model_columns"]]
+    in_range = np.all(np.abs(model_matrix) <= _MAX_MODEL_VALUE, axis=1)
+    for row in np.flatnonzero(has_metrics & ~in_range):
+      print(f"Model inference error: shot {row} has metrics out of range")
 
-    all_opt_df = generate_opt_table(df_orig)
-    model_opt_df = all_opt_df[OPT_COLS]
+    rows = np.flatnonzero(has_metrics & in_range)
+    if len(rows) == 0:
+      return results
 
-    form_probs = MODEL_FORM.predict_proba(model_opt_df)
-    final_score = calculate_percentage(form_probs, 5)
+    form_probs = models["FORM_PREDICTOR"].predict_proba(model_matrix[rows])
+    final_scores = calculate_percentage(form_probs, 5)
 
-    feedback_df = all_opt_df[FEEDBACK_COLS]
-    top_feedback = get_top_feedback(feedback_df, df_orig, 5)
+    for row, final_score in zip(rows, final_scores):
+      top_feedback = get_top_feedback(opt_matrix[row, models["feedback_columns"]], metric_dicts[row], top_n)
+      results[row] = (final_score, top_feedback)
 
-    return final_score, top_feedback
+    return results
 
   except Exception as e:
     print(f"Model inference error: {str(e)}")
-    return None, None
+    return [(None, None)] * len(metric_dicts)
+
+
+def build_feature_matrix(metric_dicts):
+  """
+  Reads the raw metrics of a batch of shots into a matrix (NaN rows for shots missing a metric).
+
+  Returns ((N_shots, len(INPUT_METRICS)) float64 matrix, (N_shots,) bool mask of complete rows).
+  """
+  feature_matrix = np.full((len(metric_dicts), len(INPUT_METRICS)), np.nan)
+  has_metrics = np.zeros(len(metric_dicts), dtype=bool)
 
+  for row, metrics in enumerate(metric_dicts):
+    try:
+      feature_matrix[row] = [metrics[metric] for metric in INPUT_METRICS]
+      has_metrics[row] = True
+    except KeyError as e:
+      print(f"Model inference error: shot {row} is missing {str(e)}")
 
-def get_top_feedback(opt_df, df_orig, top_n=10):
-  scores = opt_df.iloc[0].to_dict()
+  return feature_matrix, has_metrics
+
+
+def generate_opt_matrix(feature_matrix):
+  """
+  Scores a batch of shots: every OPT_SETTINGS feature against its min/max, plus the two "A_" rules.
+
+  Returns (N_shots, len(ALL_OPT_COLS)) float64 matrix, columns in ALL_OPT_COLS order.
+  """
+  opt_scores = {}
+
+  values = feature_matrix[:, _SCORED_INPUT_COLUMNS]
+  scored = score(values, OPT_MIN, OPT_MAX)
+  for column, opt_col in enumerate(SCORED_FEATURES):
+    opt_scores[opt_col] = scored[:, column]
+
+  setup_knee = feature_matrix[:, _INPUT_INDEX["S_avg_knee_bend"]]
+  release_knee = feature_matrix[:, _INPUT_INDEX["R_avg_knee_bend"]]
+  opt_scores["opt_A_knee_bend_order"] = np.where(setup_knee < release_knee + 3, 100.0, -100.0)
+
+  opt_scores["opt_A_head_stability"] = score_head_tilt(feature_matrix[:, [_INPUT_INDEX[metric] for metric in HEAD_TILT_METRICS]])
+
+  return np.column_stack([opt_scores[opt_col] for opt_col in load_models()["ALL_OPT_COLS"]])
+
+
+def get_top_feedback(feedback_scores, metrics, top_n=10):
+  """
+  Builds the feedback items for the worst scoring FEEDBACK_COLS of one shot.
+
+  Returns list of feedback dicts, lowest score first.
+  """
+  scores = {col: float(score_value) for col, score_value in zip(FEEDBACK_COLS, feedback_scores)}
   non_optimal = {col: score for col, score in scores.items() if score != 100}
 
   sorted_features = sorted(non_optimal.items(), key=lambda x: x[1])
@@ -44,108 +172,89 @@ def get_top_feedback(opt_df, df_orig, top_n=10):
   feedback_list = []
   for feature, score_value in top_features:
     settings = OPT_SETTINGS.get(feature, {})
-    raw_val = None
-    direction = "optimal"
 
     if settings.get("orig"):
-      raw_val = df_orig.iloc[0].get(settings["orig"])
-      if raw_val < settings["min"]:
+      if np.float64(metrics.get(settings["orig"])) < settings["min"]:
         direction = "low"
       else:
         direction = "high"
     else:
       direction = "special"
 
-    optimal_range_str = ""
-    if settings.get("min") is not None and settings.get("max") is not None:
-      optimal_range_str = f"\nOptimal range: Between {round(settings['min'], 1)} and {round(settings['max'], 1)}"
-
-    short_msg = ""
-    detailed_msg = ""
-
-    if feature in FEEDBACK_MESSAGES:
-      feedback_for_feature = FEEDBACK_MESSAGES[feature]
-      if direction in feedback_for_feature:
-        feedback_item = feedback_for_feature[direction]
-        if isinstance(feedback_item, dict):
-          short_msg = feedback_item.get("short", "")
-          detailed_msg = feedback_item.get("detailed", "")
-        else:
-          short_msg = feedback_item
-          detailed_msg = feedback_item
+    feedback_list.append(build_feedback_item(feature, score_value, direction, metrics))
+
+  return feedback_list
+
+
+def build_feedback_item(feature, score_value, direction, metrics):
+  """
+  Builds the messages of one feedback item from FEEDBACK_MESSAGES and the shot's raw metrics (for the
+  current value of the feature's metric), e.g. from a stored (feature, direction, score) reference.
+
+  Returns feedback dict.
+  """
+  settings = OPT_SETTINGS.get(feature, {})
+  raw_val = np.float64(metrics.get(settings["orig"])) if settings.get("orig") else None
+
+  optimal_range_str = ""
+  if settings.get("min") is not None and settings.get("max") is not None:
+    optimal_range_str = f"\nOptimal range: Between {round(settings['min'], 1)} and {round(settings['max'], 1)}"
+
+  short_msg = ""
+  detailed_msg = ""
+
+  if feature in FEEDBACK_MESSAGES:
+    feedback_for_feature = FEEDBACK_MESSAGES[feature]
+    if direction in feedback_for_feature:
+      feedback_item = feedback_for_feature[direction]
+      if isinstance(feedback_item, dict):
+        short_msg = feedback_item.get("short", "")
+        detailed_msg = feedback_item.get("detailed", "")
       else:
-        short_msg = "ERROR"
-        detailed_msg = "ERROR"
+        short_msg = feedback_item
+        detailed_msg = feedback_item
     else:
       short_msg = "ERROR"
       detailed_msg = "ERROR"
+  else:
+    short_msg = "ERROR"
+    detailed_msg = "ERROR"
 
-    if raw_val is not None:
-      feature_name = parse_metric(settings.get("orig", feature))[2:]
-      detailed_msg += f"\n\n{feature_name}\nCurrent value: {round(raw_val, 1)} {optimal_range_str}"
-
-    feedback_list.append({
-      "feature": feature,
-      "score": score_value,
-      "direction": direction,
-      "short": short_msg,
-      "detailed": detailed_msg,
-    })
+  if raw_val is not None:
+    feature_name = parse_metric(settings.get("orig", feature))[2:]
+    detailed_msg += f"\n\n{feature_name}\nCurrent value: {round(raw_val, 1)} {optimal_range_str}"
 
-  return feedback_list
+  return {
+    "feature": feature,
+    "score": score_value,
+    "direction": direction,
+    "short": short_msg,
+    "detailed": detailed_msg,
+  }
 
 
 def score(val, opt_min, opt_max):
-  if val < opt_min:
-    return -((opt_min - val) ** 2)
-  if val > opt_max:
-    return -((val - opt_max) ** 2)
-  return 100
-
-
-def generate_opt_table(df):
-  df = df.copy()
-  df["opt_S_avg_knee_bend"] = df["S_avg_knee_bend"].apply(lambda x: score(x, 120, 160))
-  df["opt_S_avg_body_lean"] = df["S_avg_body_lean"].apply(lambda x: score(x, -2, 4))
-  df["opt_S_avg_head_tilt"] = df["S_avg_head_tilt"].apply(lambda x: score(x, 50, 65))
-  df["opt_S_avg_elbow_angle"] = df["S_avg_elbow_angle"].apply(lambda x: score(x, 45, 90))
-
-  df["opt_R_avg_hip_angle"] = df["R_avg_hip_angle"].apply(lambda x: score(x, 160, 180))
-  df["opt_R_avg_elbow_angle"] = df["R_avg_elbow_angle"].apply(lambda x: score(x, 95, 145))
-  df["opt_R_avg_knee_bend"] = df["R_avg_knee_bend"].apply(lambda x: score(x, 154, 166))
-  df["opt_R_max_wrist_height"] = df["R_max_wrist_height"].apply(lambda x: score(x, 3.4, 7))
-  df["opt_R_avg_shoulder_angle"] = df["R_avg_shoulder_angle"].apply(lambda x: score(x, 15, 55))
-  df["opt_R_avg_body_lean"] = df["R_avg_body_lean"].apply(lambda x: score(x, -3, 5))
-  df["opt_R_forearm_deviation"] = df["R_avg_forearm_deviation"].apply(lambda x: score(x, -40, 10))
-  df["opt_R_max_setpoint"] = df["R_max_setpoint"].apply(lambda x: score(x, -4, 10))
-  df["opt_R_frame_count"] = df["R_frame_count"].apply(lambda x: score(x, 3, 12))
-
-  df["opt_F_release"] = df["F_release_angle"].apply(lambda x: score(x, 55, 79))
-  df["opt_F_elbow_above_eye"] = df["F_elbow_above_eye"].apply(lambda x: score(x, 7, 15))
-  df["opt_F_hip_angle"] = df["F_hip_angle"].apply(lambda x: score(x, 174, 180))
-  df["opt_F_knee_angle"] = df["F_knee_angle"].apply(lambda x: score(x, 170, 180))
-  df["opt_F_body_lean"] = df["F_body_lean_angle"].apply(lambda x: score(x, -2, 2.5))
-  df["opt_F_frame_count"] = df["F_frame_count"].apply(lambda x: score(x, 8, 50))
-
-  df["opt_A_knee_bend_order"] = df.apply(
-    lambda row: 100 if row["S_avg_knee_bend"] < row["R_avg_knee_bend"] + 3 else -100,
-    axis=1,
+  """
+  Elementwise: 100 inside [opt_min, opt_max], minus the squared distance outside it.
+  """
+  return np.where(
+    val < opt_min,
+    -((opt_min - val) ** 2),
+    np.where(val > opt_max, -((val - opt_max) ** 2), 100.0),
   )
 
-  df["opt_A_head_stability"] = df.apply(score_head_tilt, axis=1)
-
-  return df[ALL_OPT_COLS].copy()
-
 
-def score_head_tilt(row, threshold=15):
-  head_tilts = [row["S_avg_head_tilt"], row["R_avg_head_tilt"], row["F_head_tilt"]]
-  std_dev = np.std(head_tilts)
-  return 100 if std_dev <= threshold else -100
+def score_head_tilt(head_tilts, threshold=15):
+  """
+  Returns 100 per shot whose head tilt deviates at most threshold across the three phases, else -100.
+  """
+  std_dev = np.std(head_tilts, axis=1)
+  return np.where(std_dev <= threshold, 100.0, -100.0)
 
 
 def calculate_percentage(probabilities, max_class):
   label_scores = np.array([i / max_class * 100 for i in range(max_class + 1)])
-  final_score = np.sum(probabilities * label_scores)
+  final_score = np.sum(probabilities * label_scores, axis=-1)
   return final_score + 10
 
 
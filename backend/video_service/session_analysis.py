@@ -1,19 +1,24 @@
-import json
 import os
 import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timezone
 
 import cv2
-import mediapipe as mp
-
-from db_schema import Session as VideoSession, ShotAnalysis, db
-from .analysis import analyse_video
-from .config import BASE_URL, VIDEO_FOLDER
-from .scoring import get_model_feedback, parse_all_metrics
+import numpy as np
+
+from db_schema import Session as VideoSession, ShotAnalysis, ShotFeedback, ShotMetric, db
+from .analysis import analyse_clip_frames, analyse_video, estimate_pose_landmarks, get_key_frame_filename
+from .angles import ANGLE_COLUMNS, compute_angles
+from .config import BASE_URL, DETECTION_WORKERS, SHOT_WORKERS, VIDEO_FOLDER
+from .frames import FrameSource
+from .landmark_store import LandmarkStore
+from .landmarks import new_landmark_array
+from .pose import get_pose_pool
+from .processes import get_mp_context
+from .scoring import get_model_feedback_batch
 from .utils import ShootingAnalyzer
 
-mp_pose = mp.solutions.pose
-
 # --- CONFIGURATION & CONSTANTS ---
 TARGET_FPS = 30
 START_PADDING = 20
@@ -21,6 +26,37 @@ END_PADDING = 30
 MIN_SHOT_FRAMES = 30
 MAX_SHOT_FRAMES = 200
 MIN_GAP_BETWEEN_SHOTS = 60
+# analyse shots from the detection pass landmarks instead of re-running pose per shot clip
+REUSE_DETECTION_LANDMARKS = True
+# "staged" detects shots first (DETECTION_MODE: motion-gated windows or parallel segments, across processes)
+# and then reads each shot window again for its analysis. "streaming" decodes the upload once: pose, shot
+# detection and each shot's analysis run on the same frames, held in a ring buffer. It needs
+# REUSE_DETECTION_LANDMARKS (the detection pose is reused), but runs pose sequentially on every kept frame
+# (no motion gating or segments) and holds up to STREAM_BUFFER_FRAMES full-resolution frames per worker
+# (~1.5 GB at 1080p), so it only pays off for short uploads.
+SESSION_PIPELINE = "staged"
+# how often (in frames) detection reports progress while scanning a session
+PROGRESS_UPDATE_FRAMES = 150
+# chunked detection of long uploads: each segment is decoded with warm-up frames before it (so pose tracking
+# and the phase state machine settle close to the sequential state) and a tail after it (so its shots can finish)
+SEGMENT_WARMUP_FRAMES = MAX_SHOT_FRAMES + MIN_GAP_BETWEEN_SHOTS
+SEGMENT_TAIL_FRAMES = MAX_SHOT_FRAMES
+MIN_SEGMENT_FRAMES = 10 * (SEGMENT_WARMUP_FRAMES + SEGMENT_TAIL_FRAMES)
+# "gated" first finds activity windows with a cheap frame-difference scan and only runs pose inside them,
+# "full" runs pose on every kept frame of the video
+DETECTION_MODE = "gated"
+# the motion scan samples this many frames per second on a small grayscale copy of the shooter's half
+GATE_SAMPLE_FPS = 5
+GATE_FRAME_WIDTH = 96
+# a sample is active when this fraction of its pixels changed by more than GATE_PIXEL_DELTA grey levels
+GATE_PIXEL_DELTA = 20
+GATE_MIN_CHANGED_FRACTION = 0.01
+# active samples closer than this are joined into one window, so a brief pause does not split a shot
+GATE_JOIN_FRAMES = MIN_SHOT_FRAMES
+# if most of the video is active, gating saves nothing and the full scan is used instead
+GATE_MAX_ACTIVE_FRACTION = 0.7
+# the streaming pipeline never buffers frames further back than the longest valid shot window plus its paddings
+STREAM_BUFFER_FRAMES = MAX_SHOT_FRAMES + START_PADDING + END_PADDING
 
 os.makedirs(VIDEO_FOLDER, exist_ok=True)
 
@@ -31,76 +67,64 @@ def create_session_folder(user_id, session_hash):
     os.makedirs(folder_path, exist_ok=True)
     return folder_path
 
+def get_shot_folder_path(user_id, session_hash, shot_index):
+    return os.path.join(VIDEO_FOLDER, str(user_id), "sessions", session_hash, "shots", f"shot_{shot_index}")
+
 def create_shot_folder(user_id, session_hash, shot_index):
-    folder_path = os.path.join(VIDEO_FOLDER, str(user_id), "sessions", session_hash, "shots", f"shot_{shot_index}")
+    folder_path = get_shot_folder_path(user_id, session_hash, shot_index)
     os.makedirs(folder_path, exist_ok=True)
     return folder_path
 
+def get_session_video_path(user_id, session_hash):
+    return os.path.join(VIDEO_FOLDER, str(user_id), "sessions", session_hash, f"ORIGINAL_{session_hash}.mp4")
+
+def get_session_landmarks_path(user_id, session_hash, landmarks_file=None):
+    filename = landmarks_file or f"LANDMARKS_{session_hash}.npz"
+    return os.path.join(VIDEO_FOLDER, str(user_id), "sessions", session_hash, filename)
+
 def build_session_base_url(user_id, session_hash):
     return f"{BASE_URL}/videos/{user_id}/sessions/{session_hash}/"
 
 def build_shot_base_url(user_id, session_hash, shot_index):
     return f"{BASE_URL}/videos/{user_id}/sessions/{session_hash}/shots/shot_{shot_index}/"
 
-
-# --- HELPER FUNCTIONS: MATH & MEDIAPIPE ---
-
-_LANDMARK_MAP_LEFT = {
-    "shoulder": mp_pose.PoseLandmark.LEFT_SHOULDER.value,
-    "elbow": mp_pose.PoseLandmark.LEFT_ELBOW.value,
-    "wrist": mp_pose.PoseLandmark.LEFT_WRIST.value,
-    "index_finger": mp_pose.PoseLandmark.LEFT_INDEX.value,
-    "hip": mp_pose.PoseLandmark.LEFT_HIP.value,
-    "knee": mp_pose.PoseLandmark.LEFT_KNEE.value,
-    "ankle": mp_pose.PoseLandmark.LEFT_ANKLE.value,
-    "eye": mp_pose.PoseLandmark.LEFT_EYE.value,
-    "ear": mp_pose.PoseLandmark.LEFT_EAR.value,
-}
-
-_LANDMARK_MAP_RIGHT = {
-    "shoulder": mp_pose.PoseLandmark.RIGHT_SHOULDER.value,
-    "elbow": mp_pose.PoseLandmark.RIGHT_ELBOW.value,
-    "wrist": mp_pose.PoseLandmark.RIGHT_WRIST.value,
-    "index_finger": mp_pose.PoseLandmark.RIGHT_INDEX.value,
-    "hip": mp_pose.PoseLandmark.RIGHT_HIP.value,
-    "knee": mp_pose.PoseLandmark.RIGHT_KNEE.value,
-    "ankle": mp_pose.PoseLandmark.RIGHT_ANKLE.value,
-    "eye": mp_pose.PoseLandmark.RIGHT_EYE.value,
-    "ear": mp_pose.PoseLandmark.RIGHT_EAR.value,
-}
-
-def get_shooting_side_landmarks(landmarks, shooting_arm):
-    """
-    Get only the joints needed whether the shooter is left or right-handed
-    
-    Returns simplified dict of key landmarks with actual coordinates
+def get_shot_time_range(start_frame, end_frame, fps):
+    """
+    Returns (start, end) seconds of an inclusive frame range in the session video.
     """
-    active_map = _LANDMARK_MAP_LEFT if shooting_arm == ShootingAnalyzer.ARM_LEFT else _LANDMARK_MAP_RIGHT
-    # We only do the extraction here, no dictionary building!
-    return {key: landmarks[idx] for key, idx in active_map.items()}
+    return start_frame / fps, (end_frame + 1) / fps
+
+def build_shot_original_url(user_id, session_hash, start_time, end_time):
+    # media fragment over the session upload: players start at start_time and pause at end_time
+    return f"{build_session_base_url(user_id, session_hash)}ORIGINAL_{session_hash}.mp4#t={start_time:.3f},{end_time:.3f}"
+
+
+# --- HELPER FUNCTIONS: MATH ---
 
-def build_angles(analyzer, side_landmarks):
+def build_angles(landmark_frames, shooting_arm):
     """
-    Calculates all the biomechanical angles needed for the shot analysis
-    
-    Returns map of metric to value
+    Calculates all the biomechanical angles needed for the shot analysis, for a batch of frames in one call.
+
+    Returns list of per-frame maps of metric to value
     """
-    sl = side_landmarks # shortened
-    return {
-        "elbow": analyzer.calculate_angle(sl["shoulder"], sl["elbow"], sl["wrist"]),
-        "shoulder": analyzer.calculate_shoulder_angle(sl["hip"], sl["shoulder"], sl["elbow"]),
-        "wrist": analyzer.calculate_angle(sl["elbow"], sl["wrist"], sl["index_finger"]),
-        "body_lean": analyzer.calculate_body_lean(sl["shoulder"], sl["hip"]),
-        "hip_angle": analyzer.calculate_angle(sl["shoulder"], sl["hip"], sl["knee"]),
-        "dominant_knee": analyzer.calculate_angle(sl["hip"], sl["knee"], sl["ankle"]),
-        "head_tilt": analyzer.calculate_head_angle(sl["eye"], sl["ear"]),
-        "forearm_alignment": analyzer.calculate_forearm_alignment(sl["elbow"], sl["wrist"]),
-        "setpoint": analyzer.calculate_release_setpoint(sl["index_finger"], sl["eye"]),
-    }
+    angle_columns = compute_angles(landmark_frames, shooting_arm)
+    return [
+        {name: angle_columns[name][row] for name in ANGLE_COLUMNS}
+        for row in range(len(landmark_frames))
+    ]
 
 
 # --- CORE DETECTION LOGIC ---
 
+def is_valid_shot_length(shot_window):
+    shot_length = shot_window["end_frame"] - shot_window["start_frame"] + 1
+    return MIN_SHOT_FRAMES <= shot_length <= MAX_SHOT_FRAMES
+
+def is_valid_shot_gap(shot_window, previous_shot):
+    if previous_shot is None:
+        return True
+    return shot_window["start_frame"] - previous_shot["end_frame"] >= MIN_GAP_BETWEEN_SHOTS
+
 class MultiShotDetector(ShootingAnalyzer):
     """
     Track movement frame-by-frame to isolate individual shots from a continuous video.
@@ -118,6 +142,8 @@ class MultiShotDetector(ShootingAnalyzer):
         self.end_padding = end_padding
         # array to store detected shots with start and end frames
         self.shots = []
+        # every window with a valid length, before the gap rule (used to merge chunked detection)
+        self.candidate_shots = []
         self.current_shot_start = None
 
     def _is_valid_shot_window(self, shot_window):
@@ -126,18 +152,8 @@ class MultiShotDetector(ShootingAnalyzer):
         
         Returns True if shot window is valid, False otherwise.
         """
-        shot_length = shot_window["end_frame"] - shot_window["start_frame"] + 1
-
-        if not (MIN_SHOT_FRAMES <= shot_length <= MAX_SHOT_FRAMES):
-            return False
-
-        if self.shots:
-            previous_shot = self.shots[-1]
-            gap_between_shots = shot_window["start_frame"] - previous_shot["end_frame"]
-            if gap_between_shots < MIN_GAP_BETWEEN_SHOTS:
-                return False
-
-        return True
+        previous_shot = self.shots[-1] if self.shots else None
+        return is_valid_shot_length(shot_window) and is_valid_shot_gap(shot_window, previous_shot)
 
     def reset_for_next_shot(self):
         """
@@ -170,6 +186,8 @@ class MultiShotDetector(ShootingAnalyzer):
             }
 
 			# check if detected shot is valid, if so add to list
+            if is_valid_shot_length(candidate_shot):
+                self.candidate_shots.append(candidate_shot)
             if self._is_valid_shot_window(candidate_shot):
                 self.shots.append(candidate_shot)
 
@@ -192,126 +210,429 @@ def save_session_upload(file, user_id):
 
     return original_path, session_hash
 
-def get_video_total_frames(video_path):
+def get_video_info(video_path):
+    """
+    Returns (total frames, fps) of an uploaded session video.
+    """
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         raise ValueError(f"Could not open uploaded session video: {video_path}")
     try:
-        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0), cap.get(cv2.CAP_PROP_FPS) or TARGET_FPS
     finally:
         cap.release()
 
-def detect_shots(video_path, shooting_arm="RIGHT", start_padding=START_PADDING, end_padding=END_PADDING):
+def detect_shots(video_path, shooting_arm="RIGHT", start_padding=START_PADDING, end_padding=END_PADDING, landmark_store=None, progress_callback=None, mode=None):
     """
     Scans full video, processes poses, and returns a list of valid shot timestamps.
+    mode defaults to DETECTION_MODE. In "gated" mode pose only runs inside activity windows found by a motion
+    scan (see detect_shots_gated).
+    Long videos are split into segments that are scanned in parallel (see detect_shots_chunked).
+    If a landmark_store is given, the landmarks and angles of every processed frame are recorded into it.
+    If a progress_callback is given, it is called with the number of frames scanned so far.
 
     Returns list of detected shots with start and end frames
     """
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise ValueError(f"Could not open video: {video_path}")
+    if mode is None:
+        mode = DETECTION_MODE
+
+    total_frames = get_video_info(video_path)[0]
+
+    if mode == "gated":
+        windows = find_activity_windows(video_path, shooting_arm, start_padding, end_padding)
+        if windows is not None:
+            return detect_shots_gated(video_path, windows, total_frames, shooting_arm, start_padding, end_padding, landmark_store, progress_callback)
+
+    segments = plan_detection_segments(total_frames)
+    if len(segments) > 1:
+        return detect_shots_chunked(video_path, segments, total_frames, shooting_arm, start_padding, end_padding, landmark_store, progress_callback)
+
+    detector = scan_video_range(video_path, shooting_arm, start_padding, end_padding, landmark_store=landmark_store, progress_callback=progress_callback)
+    return detector.shots
+
+def scan_video_range(video_path, shooting_arm, start_padding, end_padding, decode_start=0, decode_end=None, landmark_store=None, progress_callback=None):
+    """
+    Runs pose estimation and the shot detector over frames decode_start..decode_end (inclusive, None = end of video).
 
-    actual_fps = cap.get(cv2.CAP_PROP_FPS) or TARGET_FPS
-    frame_rate_ratio = TARGET_FPS / actual_fps
-    frame_skip = int(1 / frame_rate_ratio) if frame_rate_ratio < 1 else 1
+    Returns the detector holding the shots found in that range.
+    """
+    # frames are kept on the same global grid whichever segment they are decoded in
+    frames = FrameSource(video_path, target_fps=TARGET_FPS, start_frame=decode_start, end_frame=decode_end)
 
     detector = MultiShotDetector(shooting_arm=shooting_arm, start_padding=start_padding, end_padding=end_padding, delta_t=1/TARGET_FPS)
-    pose = mp_pose.Pose(static_image_mode=False, model_complexity=1, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    pose_pool = get_pose_pool()
+    pose = pose_pool.acquire()
+    next_progress_frame = decode_start + PROGRESS_UPDATE_FRAMES
+    # landmarks of every frame with a pose are written straight into one preallocated block,
+    # angles are then computed for the whole range at once
+    landmark_block = new_landmark_array(frames.expected_kept_frames())
+    detected_count = 0
+    # (frame index, row in landmark_block or None) for every kept frame
+    pose_frames = []
+
+    try:
+        # only kept frames are decoded, skipped ones are grabbed past
+        for frame_index, frame in frames:
+            if detected_count == len(landmark_block):
+                landmark_block = np.concatenate([landmark_block, new_landmark_array(max(1, len(landmark_block)))])
+
+            # crop to the active shooting arm side and get full-frame landmarks
+            landmarks = estimate_pose_landmarks(pose, frame, shooting_arm, out=landmark_block[detected_count])
+            if landmarks is None:
+                pose_frames.append((frame_index, None))
+            else:
+                pose_frames.append((frame_index, detected_count))
+                detected_count += 1
+
+            if progress_callback is not None and frame_index + 1 >= next_progress_frame:
+                progress_callback(frame_index + 1)
+                next_progress_frame += PROGRESS_UPDATE_FRAMES
+    finally:
+        frames.release()
+        pose_pool.release(pose)
+
+    # the detector only reads pose results, so it can run after the batched angle kernel
+    landmark_block = landmark_block[:detected_count]
+    angle_rows = build_angles(landmark_block, shooting_arm) if detected_count else []
+
+    for frame_index, row in pose_frames:
+        landmarks = angles = None
+
+        if row is not None:
+            landmarks, angles = landmark_block[row], angle_rows[row]
+            detector.update(frame_index, angles, landmarks)
+
+        if landmark_store is not None:
+            landmark_store.record(frame_index, landmarks, angles)
+
+    if progress_callback is not None:
+        progress_callback(frames.position)
+
+    return detector
+
 
-    frame_index = 0
+# --- CHUNKED DETECTION FOR LONG VIDEOS ---
+
+def plan_detection_segments(total_frames, num_workers=None):
+    """
+    Splits a video into contiguous owned frame ranges for parallel detection (over num_workers, default
+    DETECTION_WORKERS). Videos shorter than two MIN_SEGMENT_FRAMES segments are not split.
+
+    Each segment is scanned from SEGMENT_WARMUP_FRAMES before its start, so the phase state machine and
+    MediaPipe's tracking settle before the owned range. The tracker is not carried over from the previous
+    segment though, so landmarks (and rarely a shot boundary) right after a segment start are only
+    approximately those of a sequential scan.
+
+    Returns list of (owned_start, owned_end) tuples, owned_end exclusive (None for the last segment).
+    """
+    if num_workers is None:
+        num_workers = DETECTION_WORKERS
+
+    if num_workers <= 1 or total_frames < 2 * MIN_SEGMENT_FRAMES:
+        return [(0, None)]
+
+    segment_frames = max(MIN_SEGMENT_FRAMES, -(-total_frames // num_workers))
+    starts = list(range(0, total_frames, segment_frames))
+    # fold a short trailing remainder into the previous segment
+    if len(starts) > 1 and total_frames - starts[-1] < MIN_SEGMENT_FRAMES:
+        starts.pop()
+
+    return [(start, next_start) for start, next_start in zip(starts, starts[1:] + [None])]
+
+def detect_shots_chunked(video_path, segments, total_frames, shooting_arm="RIGHT", start_padding=START_PADDING, end_padding=END_PADDING, landmark_store=None, progress_callback=None):
+    """
+    Scans each segment in its own worker process and merges the results into the sequential shot list.
+
+    Returns list of detected shots with start and end frames
+    """
+    collect_landmarks = landmark_store is not None
+    segment_candidates = [None] * len(segments)
+    frames_scanned = 0
+
+    with ProcessPoolExecutor(max_workers=min(DETECTION_WORKERS, len(segments)), mp_context=get_mp_context()) as executor:
+        futures = {
+            executor.submit(_detect_segment, video_path, shooting_arm, start_padding, end_padding, owned_start, owned_end, collect_landmarks): segment_index
+            for segment_index, (owned_start, owned_end) in enumerate(segments)
+        }
+
+        for future in as_completed(futures):
+            segment_index = futures[future]
+            candidates, landmark_records, pose_stats = future.result()
+            segment_candidates[segment_index] = candidates
+            get_pose_pool().add_stats(pose_stats)
+
+            if landmark_store is not None:
+                for frame_index, landmarks, angles in landmark_records:
+                    landmark_store.record(frame_index, landmarks, angles)
+
+            owned_start, owned_end = segments[segment_index]
+            frames_scanned += (owned_end if owned_end is not None else total_frames) - owned_start
+            if progress_callback is not None:
+                progress_callback(frames_scanned)
+
+    return merge_segment_shots(segment_candidates)
+
+def merge_segment_shots(segment_candidates):
+    """
+    Combines per-segment candidate windows, then re-applies the gap rule in frame order as the sequential detector does.
+    Duplicates from the overlapping warm-up/tail frames are already dropped, as each segment only reports windows it owns.
+
+    Returns list of detected shots with start and end frames
+    """
+    candidates = sorted(
+        (candidate for candidates in segment_candidates for candidate in candidates),
+        key=lambda candidate: candidate["start_frame"],
+    )
+
+    shots = []
+    for candidate in candidates:
+        previous_shot = shots[-1] if shots else None
+        if is_valid_shot_gap(candidate, previous_shot):
+            shots.append({**candidate, "shot_index": len(shots) + 1})
+
+    return shots
+
+def _detect_segment(video_path, shooting_arm, start_padding, end_padding, owned_start, owned_end, collect_landmarks):
+    """
+    Process pool entry point: scans one segment plus its warm-up and tail frames.
+
+    Returns (owned candidate windows, owned landmark records, pose pool stats of the scan).
+    """
+    decode_start = max(0, owned_start - SEGMENT_WARMUP_FRAMES)
+    decode_end = owned_end + SEGMENT_TAIL_FRAMES if owned_end is not None else None
+    segment_store = LandmarkStore() if collect_landmarks else None
+
+    detector = scan_video_range(video_path, shooting_arm, start_padding, end_padding, decode_start, decode_end, landmark_store=segment_store)
+
+    def is_owned(frame_index):
+        return frame_index >= owned_start and (owned_end is None or frame_index < owned_end)
+
+    candidates = [candidate for candidate in detector.candidate_shots if is_owned(candidate["start_frame"])]
+    landmark_records = []
+    if segment_store is not None:
+        landmark_records = [record for record in segment_store.records() if is_owned(record[0])]
+
+    return candidates, landmark_records, get_pose_pool().take_stats()
+
+# --- GATED (COARSE-TO-FINE) DETECTION ---
+
+def find_activity_windows(video_path, shooting_arm, start_padding, end_padding):
+    """
+    Cheap first pass: frame differencing on the shooter's half of the frame at GATE_SAMPLE_FPS.
+    Windows are padded by the shot paddings (plus one sample step) so a shot found inside one
+    gets the same clip range, and the same stored landmarks, as in a full scan.
+
+    Returns list of (start_frame, end_frame) windows (inclusive), or None if gating would not save any work.
+    """
+    frames = FrameSource(video_path, target_fps=GATE_SAMPLE_FPS)
+    sample_step = frames.frame_skip
+    active_frames = []
+    previous_gray = None
 
     try:
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            if frame_index % frame_skip == 0:
-                _, width, _ = frame.shape
-
-                # crop to focus on the active shooting arm side
-                if shooting_arm == ShootingAnalyzer.ARM_RIGHT:
-                    crop_frame, crop_x_offset = frame[:, : width // 2], 0
-                else:
-                    crop_frame, crop_x_offset = frame[:, width // 2 :], width // 2
-
-                rgb_frame = cv2.cvtColor(crop_frame, cv2.COLOR_BGR2RGB)
-                results = pose.process(rgb_frame)
-
-                if results.pose_landmarks:
-                    landmarks = results.pose_landmarks.landmark
-                    # normalize landmarks back to full frame dimensions
-                    for lm in landmarks:
-                        lm.x = ((lm.x * (width // 2)) + crop_x_offset) / width
-
-                    side_landmarks = get_shooting_side_landmarks(landmarks, detector.SHOOTING_ARM)
-                    angles = build_angles(detector, side_landmarks)
-
-                    # sub-selection needed by the tracking algorithm
-                    tracking_landmarks = {
-                        "wrist": side_landmarks["wrist"],
-                        "eye": side_landmarks["eye"],
-                        "shoulder": side_landmarks["shoulder"],
-                        "hip": side_landmarks["hip"],
-                        "elbow": side_landmarks["elbow"],
-                        "index_finger": side_landmarks["index_finger"],
-                    }
-                    detector.update(frame_index, angles, tracking_landmarks)
-
-            frame_index += 1
+        for frame_index, frame in frames:
+            height, width, _ = frame.shape
+            crop_frame = frame[:, :width // 2] if shooting_arm == "RIGHT" else frame[:, width // 2:]
+
+            scale = GATE_FRAME_WIDTH / crop_frame.shape[1]
+            small_frame = cv2.resize(crop_frame, (GATE_FRAME_WIDTH, max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+            gray = cv2.GaussianBlur(cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+
+            if previous_gray is not None:
+                changed_fraction = (cv2.absdiff(gray, previous_gray) > GATE_PIXEL_DELTA).mean()
+                if changed_fraction >= GATE_MIN_CHANGED_FRACTION:
+                    active_frames.append(frame_index)
+            previous_gray = gray
     finally:
-        cap.release()
-        pose.close()
+        frames.release()
 
-    return detector.shots
+    total_frames = frames.position
+    if total_frames == 0:
+        return None
+
+    # motion between two samples can start anywhere after the earlier one
+    windows = []
+    for frame_index in active_frames:
+        start_frame = max(0, frame_index - sample_step - start_padding)
+        end_frame = min(total_frames - 1, frame_index + sample_step + end_padding)
+        if windows and start_frame - windows[-1][1] <= GATE_JOIN_FRAMES:
+            windows[-1] = (windows[-1][0], end_frame)
+        else:
+            windows.append((start_frame, end_frame))
 
-def extract_frame_range_to_video(input_path, output_path, start_frame, end_frame):
+    active_total = sum(end_frame - start_frame + 1 for start_frame, end_frame in windows)
+    if active_total > GATE_MAX_ACTIVE_FRACTION * total_frames:
+        return None
+
+    return windows
+
+def detect_shots_gated(video_path, windows, total_frames, shooting_arm="RIGHT", start_padding=START_PADDING, end_padding=END_PADDING, landmark_store=None, progress_callback=None):
     """
-    Crop video into a smaller clip based on start and end frames and saves.
+    Second pass: full-rate pose and a fresh shot detector inside each activity window.
+    Windows are scanned in parallel when there is more than one detection worker.
 
-	Returns path to the saved clip.
+    Returns list of detected shots with start and end frames
     """
-    cap = cv2.VideoCapture(input_path)
-    if not cap.isOpened():
-        raise ValueError(f"Could not open video for clip extraction: {input_path}")
+    collect_landmarks = landmark_store is not None
+    window_tasks = [
+        (video_path, shooting_arm, start_padding, end_padding, start_frame, end_frame, collect_landmarks)
+        for start_frame, end_frame in windows
+    ]
+
+    if DETECTION_WORKERS > 1 and len(window_tasks) > 1:
+        executor = ProcessPoolExecutor(max_workers=min(DETECTION_WORKERS, len(window_tasks)), mp_context=get_mp_context())
+        window_results = executor.map(_detect_window, window_tasks)
+    else:
+        executor = None
+        window_results = map(_detect_window, window_tasks)
+
+    window_candidates = []
+    try:
+        for (_, end_frame), (candidates, landmark_records, pose_stats) in zip(windows, window_results):
+            window_candidates.append(candidates)
+            get_pose_pool().add_stats(pose_stats)
 
-    fps = cap.get(cv2.CAP_PROP_FPS) or TARGET_FPS
-    frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if landmark_store is not None:
+                for frame_index, landmarks, angles in landmark_records:
+                    landmark_store.record(frame_index, landmarks, angles)
 
-    # ensure valid frame range
-    start_frame = max(0, start_frame)
-    end_frame = min(end_frame, max(0, total_frames - 1))
-    if end_frame < start_frame:
-        cap.release()
-        raise ValueError(f"Invalid frame range: start={start_frame}, end={end_frame}")
+            if progress_callback is not None:
+                progress_callback(end_frame + 1)
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    out = cv2.VideoWriter(output_path, fourcc, fps, (frame_width, frame_height))
-    
-    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-    current_frame = start_frame
+    if progress_callback is not None:
+        progress_callback(total_frames)
+
+    return merge_segment_shots(window_candidates)
+
+def _detect_window(window_task):
+    """
+    Scans one activity window with a freshly reset pose tracker and its own detector.
+
+    Returns (candidate windows, landmark records, pose pool stats of the scan).
+    """
+    video_path, shooting_arm, start_padding, end_padding, start_frame, end_frame, collect_landmarks = window_task
+    window_store = LandmarkStore() if collect_landmarks else None
+
+    detector = scan_video_range(video_path, shooting_arm, start_padding, end_padding, start_frame, end_frame, landmark_store=window_store)
+
+    landmark_records = window_store.records() if window_store is not None else []
+    return detector.candidate_shots, landmark_records, get_pose_pool().take_stats()
+
+# --- DETECTION FROM A SAVED SERIES ---
+
+def detect_shots_from_series(landmark_store, shooting_arm="RIGHT", frame_skip=1, start_padding=START_PADDING, end_padding=END_PADDING):
+    """
+    Replays a saved landmark series through MultiShotDetector, without decoding or pose estimation.
+    Each contiguous run of kept frames gets a fresh detector, as each activity window did in gated detection
+    (a full or chunked scan is a single run, so this gives its sequential result).
+
+    Returns list of detected shots with start and end frames
+    """
+    run_candidates = []
+    detector = None
+    previous_index = None
+
+    for frame_index, landmarks, angles in landmark_store.records():
+        if previous_index is None or frame_index - previous_index > frame_skip:
+            if detector is not None:
+                run_candidates.append(detector.candidate_shots)
+            detector = MultiShotDetector(shooting_arm=shooting_arm, start_padding=start_padding, end_padding=end_padding, delta_t=1/TARGET_FPS)
+        previous_index = frame_index
+
+        if landmarks is not None:
+            detector.update(frame_index, angles, landmarks)
+
+    if detector is not None:
+        run_candidates.append(detector.candidate_shots)
+
+    return merge_segment_shots(run_candidates)
+
+
+# --- STREAMING SESSION PIPELINE ---
+
+def stream_session(video_path, session_hash, user_id, shooting_arm, fps, landmark_store, progress_callback=None):
+    """
+    Single-decode session pipeline: every kept frame of the upload is decoded once, runs through pose and the
+    shot detector, and is held in a bounded ring buffer. As soon as an accepted shot's window has been read,
+    the shot is analysed (metrics, key frames) from the buffered frames.
+    Gives the same shots and metrics as a sequential full scan followed by analysis from its landmarks.
+
+    Returns list of shot results in shot_index order, to be scored by score_shot_results.
+    """
+    frames = FrameSource(video_path, target_fps=TARGET_FPS)
+    detector = MultiShotDetector(shooting_arm=shooting_arm, delta_t=1/TARGET_FPS)
+    pose_pool = get_pose_pool()
+    pose = pose_pool.acquire()
+    # (frame index, frame, landmarks, angles) of the recent kept frames a shot window can still reach
+    ring_buffer = deque()
+    pending_shots = []
+    shot_results = []
+    next_progress_frame = PROGRESS_UPDATE_FRAMES
 
     try:
-        while current_frame <= end_frame:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            out.write(frame)
-            current_frame += 1
+        for frame_index, frame in frames:
+            landmarks = estimate_pose_landmarks(pose, frame, shooting_arm)
+            angles = None
+            if landmarks is not None:
+                angles = build_angles(landmarks[None], shooting_arm)[0]
+                accepted_count = len(detector.shots)
+                detector.update(frame_index, angles, landmarks)
+                pending_shots.extend(detector.shots[accepted_count:])
+            landmark_store.record(frame_index, landmarks, angles)
+
+            ring_buffer.append((frame_index, frame, landmarks, angles))
+            while ring_buffer[0][0] < _stream_buffer_start(detector, pending_shots, frame_index):
+                ring_buffer.popleft()
+
+            # shots whose whole window has been read
+            while pending_shots and pending_shots[0]["end_frame"] <= frame_index:
+                shot_results.append(_analyse_buffered_shot(pending_shots.pop(0), ring_buffer, session_hash, user_id, shooting_arm, fps))
+
+            if progress_callback is not None and frame_index + 1 >= next_progress_frame:
+                progress_callback(frame_index + 1)
+                next_progress_frame += PROGRESS_UPDATE_FRAMES
+
+        # windows running past the end of the video
+        for shot in pending_shots:
+            shot_results.append(_analyse_buffered_shot(shot, ring_buffer, session_hash, user_id, shooting_arm, fps))
     finally:
-        cap.release()
-        out.release()
+        frames.release()
+        pose_pool.release(pose)
+
+    if progress_callback is not None:
+        progress_callback(frames.position)
+
+    return shot_results
+
+def _stream_buffer_start(detector, pending_shots, frame_index):
+    # first frame any shot can still need: the padded start of a shot in progress (or of one starting now),
+    # and of any accepted shot still waiting for its end padding, never more than STREAM_BUFFER_FRAMES back
+    shot_start = detector.current_shot_start if detector.current_shot_start is not None else frame_index
+    buffer_start = shot_start - detector.start_padding
+    if pending_shots:
+        buffer_start = min(buffer_start, pending_shots[0]["start_frame"])
+    return max(buffer_start, frame_index - STREAM_BUFFER_FRAMES)
+
+def _analyse_buffered_shot(shot, ring_buffer, session_hash, user_id, shooting_arm, fps):
+    shot_folder_path = create_shot_folder(user_id, session_hash, shot["shot_index"])
+    clip_frames = [buffered for buffered in ring_buffer if shot["start_frame"] <= buffered[0] <= shot["end_frame"]]
+    # the key frames are still buffered, nothing is decoded again
+    read_frames = lambda frame_indices: {frame_index: frame for frame_index, frame, _, _ in clip_frames if frame_index in frame_indices}
 
-    return output_path
+    analysis_results = analyse_clip_frames(clip_frames, shooting_arm, shot_folder_path, read_frames, TARGET_FPS)
+    return build_shot_result(user_id, session_hash, shot, fps, shot_folder_path, analysis_results["metrics"])
 
 
 # --- MAIN ENTRY POINTS ---
 
-def process_session_upload(file, user_id, shooting_arm="RIGHT"):
+def create_session_upload(file, user_id, shooting_arm="RIGHT"):
     """
-    Main Orchestrator: Saves file, initializes DB, detects shots, and spawns processing for each shot.
+    Saves the uploaded file and creates the queued session record for it.
+
+    Returns the new session record.
     """
     original_file_path, session_hash = save_session_upload(file, user_id)
     if not original_file_path:
@@ -319,31 +640,60 @@ def process_session_upload(file, user_id, shooting_arm="RIGHT"):
 
     # create url to store original video
     session_url = f"{build_session_base_url(user_id, session_hash)}ORIGINAL_{session_hash}.mp4"
+    total_frames, fps = get_video_info(original_file_path)
     
 	# create initial record for session
     session_record = VideoSession(
         user_id=user_id,
         hashed_filename=session_hash,
         shooting_arm=shooting_arm,
-        status="processing",
+        status="queued",
         original_video_url=session_url,
         shot_count=0,
-        total_frames=get_video_total_frames(original_file_path),
+        total_frames=total_frames,
+        fps=fps,
+        frames_processed=0,
         created_at=datetime.now(timezone.utc),
     )
     db.session.add(session_record)
     db.session.commit()
 
+    return session_record
+
+def process_session(session_record, progress_callback=None):
+    """
+    Main Orchestrator: detects shots in a saved session upload and spawns processing for each shot.
+    """
+    user_id = session_record.user_id
+    session_hash = session_record.hashed_filename
+    shooting_arm = session_record.shooting_arm
+    original_file_path = get_session_video_path(user_id, session_hash)
+    if session_record.fps is None:
+        session_record.fps = get_video_info(original_file_path)[1]
+
+    session_record.status = "processing"
+    db.session.commit()
+
     try:
-        # detect shots and process each one
-        detected_shots = detect_shots(original_file_path, shooting_arm=shooting_arm)
-        
-        for shot in detected_shots:
-            shot_record = process_detected_shot(session_record, original_file_path, session_hash, user_id, shot, shooting_arm)
-            db.session.add(shot_record)
+        # detect shots and keep the per-frame series so the session can be re-analysed without decoding
+        landmark_store = LandmarkStore()
+        if SESSION_PIPELINE == "streaming" and REUSE_DETECTION_LANDMARKS:
+            # detection and the analysis of each shot in one decode of the upload
+            shot_results = score_shot_results(stream_session(original_file_path, session_hash, user_id, shooting_arm, session_record.fps, landmark_store, progress_callback))
+            session_record.landmarks_file = save_session_landmarks(landmark_store, user_id, session_hash, shooting_arm, detection_mode="full")
+        else:
+            detected_shots = detect_shots(original_file_path, shooting_arm=shooting_arm, landmark_store=landmark_store, progress_callback=progress_callback)
+            session_record.landmarks_file = save_session_landmarks(landmark_store, user_id, session_hash, shooting_arm)
+
+            # process each shot
+            reuse_store = landmark_store if REUSE_DETECTION_LANDMARKS else None
+            shot_results = analyse_detected_shots(original_file_path, session_hash, user_id, detected_shots, shooting_arm, session_record.fps, reuse_store)
+
+        # write every shot and the final session state in a single transaction
+        db.session.add_all([build_shot_record(session_record, shot_result) for shot_result in shot_results])
         
 		# update session record with final shot count and set status to complete
-        session_record.shot_count = len(detected_shots)
+        session_record.shot_count = len(shot_results)
         session_record.status = "complete"
         
         db.session.commit()
@@ -356,48 +706,182 @@ def process_session_upload(file, user_id, shooting_arm="RIGHT"):
         db.session.commit()
         raise
 
-def process_detected_shot(session_record, full_video_path, session_hash, user_id, shot, shooting_arm):
+def save_session_landmarks(landmark_store, user_id, session_hash, shooting_arm, detection_mode=None):
     """
-    Sub-Orchestrator: Perform analysis on a single detected shot and saves results to DB.
+    Writes the detection pass landmarks and angles to LANDMARKS_<hash>.npz next to the original video,
+    with the detection mode that produced them (default DETECTION_MODE).
+
+    Returns the file name to store on the session record.
     """
-    shot_index = shot["shot_index"]
-    shot_folder_path = create_shot_folder(user_id, session_hash, shot_index)
-    shot_folder_name = os.path.basename(shot_folder_path)
+    if detection_mode is None:
+        detection_mode = DETECTION_MODE
 
-    original_clip_filename = f"ORIGINAL_{shot_folder_name}.mp4"
-    original_clip_path = os.path.join(shot_folder_path, original_clip_filename)
+    landmarks_path = get_session_landmarks_path(user_id, session_hash)
+    landmark_store.save(landmarks_path, shooting_arm=shooting_arm, target_fps=TARGET_FPS, detection_mode=detection_mode)
+    return os.path.basename(landmarks_path)
 
-    # 1. get clip
-    extract_frame_range_to_video(full_video_path, original_clip_path, shot["start_frame"], shot["end_frame"])
+def load_session_landmarks(user_id, session_hash, landmarks_file):
+    """
+    Reads the saved landmark series of a session (Session.landmarks_file).
 
-    # 2. run form analysis 
-    analysis_results = analyse_video(original_clip_path, shooting_arm=shooting_arm)
+    Returns (LandmarkStore, metadata dict), or (None, None) if the session has no series.
+    """
+    if not landmarks_file:
+        return None, None
+
+    landmarks_path = get_session_landmarks_path(user_id, session_hash, landmarks_file)
+    if not os.path.exists(landmarks_path):
+        return None, None
+
+    return LandmarkStore.load(landmarks_path)
+
+def process_session_upload(file, user_id, shooting_arm="RIGHT"):
+    """
+    Saves an upload and processes it synchronously (the /upload route queues it instead).
+    """
+    session_record = create_session_upload(file, user_id, shooting_arm)
+    return process_session(session_record)
+
+def analyse_detected_shots(full_video_path, session_hash, user_id, detected_shots, shooting_arm, fps=TARGET_FPS, landmark_store=None):
+    """
+    Runs the per-shot analysis for every detected shot, fanned out across a process pool of SHOT_WORKERS,
+    then scores all of the session's shots with one model call.
+
+    Returns list of shot results in shot_index order.
+    """
+    shot_tasks = []
+    for shot in detected_shots:
+        landmark_frames = None
+        if landmark_store is not None:
+            landmark_frames = landmark_store.window(shot["start_frame"], shot["end_frame"])
+        shot_tasks.append((full_video_path, session_hash, user_id, shot, shooting_arm, fps, landmark_frames))
+
+    if SHOT_WORKERS <= 1 or len(shot_tasks) <= 1:
+        shot_results = [process_detected_shot(*shot_task) for shot_task in shot_tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(SHOT_WORKERS, len(shot_tasks)), mp_context=get_mp_context()) as executor:
+            # map keeps results in submission (shot_index) order
+            shot_results = []
+            for shot_result, pose_stats in executor.map(_process_detected_shot_in_worker, shot_tasks):
+                shot_results.append(shot_result)
+                get_pose_pool().add_stats(pose_stats)
+
+    return score_shot_results(shot_results)
+
+def process_detected_shot(full_video_path, session_hash, user_id, shot, shooting_arm, fps=TARGET_FPS, landmark_frames=None, pose=None):
+    """
+    Sub-Orchestrator: Perform analysis on a single detected shot.
+    The shot is read straight from the session upload; its "original" is a time range over that file
+    (no clip is cut or re-encoded).
+    With landmark_frames, the shot is analysed from the detection pass landmarks (no second pose pass).
+
+    Returns dict of shot results with the raw metrics, to be scored by score_shot_results.
+    """
+    shot_folder_path = create_shot_folder(user_id, session_hash, shot["shot_index"])
+
+    # run form analysis on the shot's frame range of the session upload
+    analysis_results = analyse_video(
+        full_video_path, shooting_arm=shooting_arm, landmark_frames=landmark_frames, pose=pose,
+        start_frame=shot["start_frame"], end_frame=shot["end_frame"], output_folder=shot_folder_path,
+    )
     if "error" in analysis_results:
         raise ValueError(analysis_results["error"])
 
-    # 3. parse metrics and get model feedback
-    metrics = analysis_results.get("metrics", {})
-    parsed_metrics = parse_all_metrics(metrics)
-    probability, feedback = get_model_feedback(metrics)
-
-    if probability is None:
-        raise ValueError(f"Model prediction failed for shot {shot_index}")
+    return build_shot_result(user_id, session_hash, shot, fps, shot_folder_path, analysis_results.get("metrics", {}))
 
+def build_shot_result(user_id, session_hash, shot, fps, shot_folder_path, metrics):
+    """
+    Returns dict of shot results with the raw metrics, to be scored by score_shot_results.
+    """
+    shot_index = shot["shot_index"]
+    shot_folder_name = os.path.basename(shot_folder_path)
     shot_base_url = build_shot_base_url(user_id, session_hash, shot_index)
+    start_time, end_time = get_shot_time_range(shot["start_frame"], shot["end_frame"], fps)
+
+    return {
+        "shot_index": shot_index,
+        "start_frame": shot["start_frame"],
+        "end_frame": shot["end_frame"],
+        "start_time": start_time,
+        "end_time": end_time,
+        "metrics": metrics,
+        "video_url": f"{shot_base_url}VIDEO_{shot_folder_name}.mp4",
+        "original_video_url": build_shot_original_url(user_id, session_hash, start_time, end_time),
+        "setup_frame_url": f"{shot_base_url}{get_key_frame_filename('Setup', shot_folder_name)}",
+        "release_frame_url": f"{shot_base_url}{get_key_frame_filename('Release', shot_folder_name)}",
+        "follow_frame_url": f"{shot_base_url}{get_key_frame_filename('Follow-through', shot_folder_name)}",
+        "thumbnail_url": f"{shot_base_url}{get_key_frame_filename('Setup', shot_folder_name, 'thumb')}",
+    }
 
-    # 4. Create and return the DB record for individual shot analysis
+def score_shot_results(shot_results):
+    """
+    Adds the model probability and feedback to every shot result, from a single batched prediction.
+
+    Returns the shot results.
+    """
+    model_feedback = get_model_feedback_batch([shot_result["metrics"] for shot_result in shot_results])
+
+    for shot_result, (probability, feedback) in zip(shot_results, model_feedback):
+        if probability is None:
+            raise ValueError(f"Model prediction failed for shot {shot_result['shot_index']}")
+        shot_result["probability"] = float(probability)
+        shot_result["feedback"] = feedback
+
+    return shot_results
+
+def build_shot_record(session_record, shot_result):
+    """
+    Creates the DB record for an individual shot analysis.
+    """
     return ShotAnalysis(
         session_id=session_record.id,
-        shot_index=shot_index,
-        start_frame=shot["start_frame"],
-        end_frame=shot["end_frame"],
+        shot_index=shot_result["shot_index"],
+        start_frame=shot_result["start_frame"],
+        end_frame=shot_result["end_frame"],
+        start_time=shot_result["start_time"],
+        end_time=shot_result["end_time"],
         created_at=datetime.now(timezone.utc),
-        metrics_json=json.dumps(parsed_metrics),
-        make_probability=float(probability),
-        form_feedback_json=json.dumps(feedback, default=str),
-        video_url=f"{shot_base_url}VIDEO_{shot_folder_name}.mp4",
-        original_video_url=f"{shot_base_url}{original_clip_filename}",
-        setup_frame_url=f"{shot_base_url}SETUP_{shot_folder_name}.png",
-        release_frame_url=f"{shot_base_url}RELEASE_{shot_folder_name}.png",
-        follow_frame_url=f"{shot_base_url}FOLLOW_{shot_folder_name}.png",
+        make_probability=shot_result["probability"],
+        metrics=build_metric_records(shot_result["metrics"]),
+        feedback=build_feedback_records(shot_result["feedback"]),
+        video_url=shot_result["video_url"],
+        original_video_url=shot_result["original_video_url"],
+        setup_frame_url=shot_result["setup_frame_url"],
+        release_frame_url=shot_result["release_frame_url"],
+        follow_frame_url=shot_result["follow_frame_url"],
+        thumbnail_url=shot_result["thumbnail_url"],
     )
+
+def build_metric_records(metrics):
+    return [ShotMetric(metric=metric, value=value, is_integer=isinstance(value, int)) for metric, value in get_metric_values(metrics)]
+
+def build_feedback_records(feedback):
+    return [ShotFeedback(feature=feature, direction=direction, score=score) for feature, direction, score in get_feedback_values(feedback)]
+
+def get_metric_values(metrics):
+    """
+    Returns list of (metric, value) rows of the raw metrics as shot_metrics stores them: NaN as None, integer
+    metrics (e.g. frame counts) as int and the others as float.
+    """
+    return [(metric, _get_metric_value(value)) for metric, value in metrics.items()]
+
+def get_feedback_values(feedback):
+    """
+    Returns list of (feature, direction, score) rows of the feedback items as shot_feedback stores them.
+    """
+    return [(item["feature"], item["direction"], float(item["score"])) for item in feedback]
+
+def _get_metric_value(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return None if np.isnan(value) else float(value)
+
+def _process_detected_shot_in_worker(shot_task):
+    """
+    Process pool entry point: pose (when it has to be re-run) uses the worker process's pose pool,
+    so each worker keeps one warm instance across its shots.
+
+    Returns (shot result, pose pool stats of the shot).
+    """
+    shot_result = process_detected_shot(*shot_task)
+    return shot_result, get_pose_pool().take_stats()
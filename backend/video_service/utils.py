@@ -1,6 +1,8 @@
 import numpy as np
 import cv2
 
+from .landmarks import X, Y, get_side_indices
+
 
 class ShootingAnalyzer:
     """
@@ -22,6 +24,8 @@ class ShootingAnalyzer:
     def __init__(self, SHOOTING_ARM="RIGHT", delta_t=1 / 30):
         self.SHOOTING_ARM = SHOOTING_ARM
         self.delta_t = delta_t
+        # landmark indices of the shooting side joints, landmarks arrive as (33, 4) arrays
+        self.side_indices = get_side_indices(SHOOTING_ARM)
         self.shot_completed = False
 
         self.follow_through_frame_count = 0
@@ -90,11 +94,12 @@ class ShootingAnalyzer:
         }
 
     # --- BIOMECHANICAL MATH HELPERS ---
+    # joints are landmark rows (x, y, z, visibility), maths is done in float64
 
     def calculate_angle(self, a, b, c):
-        a = np.array([a.x, a.y])
-        b = np.array([b.x, b.y])
-        c = np.array([c.x, c.y])
+        a = _xy(a)
+        b = _xy(b)
+        c = _xy(c)
 
         ba = a - b
         bc = c - b
@@ -107,8 +112,8 @@ class ShootingAnalyzer:
     def calculate_shoulder_angle(self, hip, shoulder, elbow):
         base_angle = self.calculate_angle(hip, shoulder, elbow)
 
-        shoulder_hip_vector = np.array([hip.x - shoulder.x, hip.y - shoulder.y])
-        shoulder_elbow_vector = np.array([elbow.x - shoulder.x, elbow.y - shoulder.y])
+        shoulder_hip_vector = _xy(hip) - _xy(shoulder)
+        shoulder_elbow_vector = _xy(elbow) - _xy(shoulder)
 
         cross_product_z = np.cross(shoulder_hip_vector, shoulder_elbow_vector)
 
@@ -122,16 +127,14 @@ class ShootingAnalyzer:
             return -base_angle
 
     def calculate_head_angle(self, eye, ear):
-        dx = eye.x - ear.x
-        dy = eye.y - ear.y
+        dx, dy = _xy(eye) - _xy(ear)
 
         angle_rad = np.arctan2(dy, dx)
         head_angle = -np.degrees(angle_rad)
         return head_angle
 
     def calculate_body_lean(self, shoulder, hip):
-        dx = shoulder.x - hip.x
-        dy = shoulder.y - hip.y
+        dx, dy = _xy(shoulder) - _xy(hip)
 
         angle_radians = np.arctan2(dx, -dy)
         angle_degrees = np.degrees(angle_radians)
@@ -142,8 +145,7 @@ class ShootingAnalyzer:
             return -angle_degrees
 
     def calculate_forearm_alignment(self, elbow, wrist):
-        dx = wrist.x - elbow.x
-        dy = wrist.y - elbow.y
+        dx, dy = _xy(wrist) - _xy(elbow)
 
         angle_rad = np.arctan2(dx, -dy)
         out = np.degrees(angle_rad)
@@ -154,9 +156,9 @@ class ShootingAnalyzer:
             return -out
 
     def calculate_wrist_angle(self, elbow, wrist, index_finger):
-        wrist_point = np.array([wrist.x, wrist.y])
-        index_point = np.array([index_finger.x, index_finger.y])
-        elbow_point = np.array([elbow.x, elbow.y])
+        wrist_point = _xy(wrist)
+        index_point = _xy(index_finger)
+        elbow_point = _xy(elbow)
 
         wrist_elbow_vector = wrist_point - elbow_point
         wrist_index_vector = index_point - wrist_point
@@ -181,21 +183,21 @@ class ShootingAnalyzer:
 
     # calculates the height of wrist relative to the eye, normalized to torso length
     def calculate_wrist_height(self, wrist, eye, shoulder, hip):
-        torso_length = abs(shoulder.y - hip.y)
-        wrist_eye_diff = eye.y - wrist.y
+        torso_length = abs(float(shoulder[Y]) - float(hip[Y]))
+        wrist_eye_diff = float(eye[Y]) - float(wrist[Y])
         normalized = wrist_eye_diff / torso_length if torso_length != 0 else 0
         return normalized * 10
 
     # calculates the height of elbow relative to the eye, normalized to torso length
     def calculate_elbow_eye_height(self, elbow, eye, shoulder, hip):
-        torso_length = abs(shoulder.y - hip.y)
-        elbow_eye_diff = eye.y - elbow.y
+        torso_length = abs(float(shoulder[Y]) - float(hip[Y]))
+        elbow_eye_diff = float(eye[Y]) - float(elbow[Y])
         normalized = elbow_eye_diff / torso_length if torso_length != 0 else 0
         return (elbow_eye_diff * 1000) / 2
 
     def calculate_release_setpoint(self, index_finger, eye):
-        x_index_finger = index_finger.x
-        x_eye = eye.x
+        x_index_finger = float(index_finger[X])
+        x_eye = float(eye[X])
 
         if self.SHOOTING_ARM == self.ARM_RIGHT:
             diff = x_index_finger - x_eye
@@ -219,6 +221,7 @@ class ShootingAnalyzer:
 
     def _accumulate_release_metrics(self, hip_angle, knee_angle, elbow_angle, shoulder_angle, head_tilt, body_lean, forearm_deviation, landmarks):
         release_metrics = self.metrics[self.PHASE_RELEASE]
+        side = self.side_indices
         release_metrics["total_hip_angle"] += hip_angle
         release_metrics["total_knee_bend"] += knee_angle
         release_metrics["total_elbow_angle"] += elbow_angle
@@ -228,11 +231,11 @@ class ShootingAnalyzer:
         release_metrics["total_forearm_deviation"] += forearm_deviation
         release_metrics["max_wrist_height"] = max(
             release_metrics["max_wrist_height"],
-            self.calculate_wrist_height(landmarks["wrist"], landmarks["eye"], landmarks["shoulder"], landmarks["hip"]),
+            self.calculate_wrist_height(landmarks[side["wrist"]], landmarks[side["eye"]], landmarks[side["shoulder"]], landmarks[side["hip"]]),
         )
         release_metrics["max_setpoint"] = min(
             release_metrics["max_setpoint"],
-            self.calculate_release_setpoint(landmarks["index_finger"], landmarks["eye"]),
+            self.calculate_release_setpoint(landmarks[side["index_finger"]], landmarks[side["eye"]]),
         )
 
     def _finalize_setup_metrics(self):
@@ -260,9 +263,10 @@ class ShootingAnalyzer:
 
     def _store_follow_through_metrics(self, shoulder_angle, body_lean, hip_angle, knee_angle, head_tilt, landmarks):
         follow_through_metrics = self.metrics[self.PHASE_FOLLOW_THROUGH]
+        side = self.side_indices
         if not follow_through_metrics["stored"]:
             follow_through_metrics["release_angle"] = int(shoulder_angle - 90 - body_lean)
-            follow_through_metrics["elbow_above_eye"] = self.calculate_elbow_eye_height(landmarks["elbow"], landmarks["eye"], landmarks["shoulder"], landmarks["hip"])
+            follow_through_metrics["elbow_above_eye"] = self.calculate_elbow_eye_height(landmarks[side["elbow"]], landmarks[side["eye"]], landmarks[side["shoulder"]], landmarks[side["hip"]])
             follow_through_metrics["body_lean_angle"] = body_lean
             follow_through_metrics["hip_angle"] = hip_angle
             follow_through_metrics["knee_angle"] = knee_angle
@@ -420,6 +424,7 @@ class ShootingAnalyzer:
         """
         Called every frame. Handles different phases and runs the appropriate logic.
         Checks the current phase, routes the data to the correct handler, and returns the updated phase.
+        landmarks is the frame's (33, 4) landmark array, read through self.side_indices.
         """
         if self.current_phase == self.PHASE_COMPLETE:
             return self.current_phase
@@ -537,4 +542,9 @@ class ShootingAnalyzer:
 
             for metric in metrics_list:
                 cv2.putText(frame, metric, (x, y), font, 0.6, color, 2)
-                y += 30
\ No newline at end of file
+                y += 30
+
+
+def _xy(point):
+    # landmark rows are float32, promote so the maths matches the original python-float protobuf values
+    return np.array([point[X], point[Y]], dtype=np.float64)
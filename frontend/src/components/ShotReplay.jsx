@@ -0,0 +1,178 @@
+import React, { useEffect, useRef, useState } from "react";
+import axios from "axios";
+
+const FALLBACK_FPS = 30;
+
+// joints arrive as base64 of little-endian int16 (frames x joints x (x, y)), scaled by point_scale
+function decodeOverlay(data) {
+  const binary = atob(data.points);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i += 1) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+
+  return {
+    ...data,
+    fps: data.fps || FALLBACK_FPS,
+    points: new Int16Array(bytes.buffer),
+  };
+}
+
+// last overlay frame at or before the given session frame, -1 outside the shot
+function findOverlayFrame(frameIndices, frame) {
+  if (!frameIndices.length || frame < frameIndices[0]) return -1;
+
+  let low = 0;
+  let high = frameIndices.length - 1;
+  while (low < high) {
+    const mid = (low + high + 1) >> 1;
+    if (frameIndices[mid] <= frame) {
+      low = mid;
+    } else {
+      high = mid - 1;
+    }
+  }
+  return low;
+}
+
+function drawSkeleton(canvas, video, overlay) {
+  const context = canvas.getContext("2d");
+  const width = video.clientWidth;
+  const height = video.clientHeight;
+
+  if (canvas.width !== width || canvas.height !== height) {
+    canvas.width = width;
+    canvas.height = height;
+    // inside the video's border
+    canvas.style.left = `${video.offsetLeft + video.clientLeft}px`;
+    canvas.style.top = `${video.offsetTop + video.clientTop}px`;
+  }
+  context.clearRect(0, 0, width, height);
+
+  // the original clip is the session upload, so currentTime is in session time
+  const frame = Math.floor(video.currentTime * overlay.fps + 1e-6);
+  if (frame > overlay.end_frame) return;
+
+  const row = findOverlayFrame(overlay.frame_indices, frame);
+  const phase = row >= 0 ? overlay.frame_phases[row] : -1;
+  if (phase < 0) return;
+
+  const offset = row * overlay.joint_count * 2;
+  const scaleX = width / overlay.point_scale;
+  const scaleY = height / overlay.point_scale;
+  const jointX = (joint) => overlay.points[offset + joint * 2] * scaleX;
+  const jointY = (joint) => overlay.points[offset + joint * 2 + 1] * scaleY;
+
+  // line and joint sizes of the server-rendered videos, relative to the source resolution
+  const lineScale = video.videoWidth ? width / video.videoWidth : 1;
+  context.strokeStyle = overlay.phases[phase].color;
+  context.fillStyle = overlay.phases[phase].color;
+  context.lineWidth = Math.max(lineScale, 1);
+
+  context.beginPath();
+  for (const [start, end] of overlay.edges) {
+    context.moveTo(jointX(start), jointY(start));
+    context.lineTo(jointX(end), jointY(end));
+  }
+  context.stroke();
+
+  for (let joint = 0; joint < overlay.joint_count; joint += 1) {
+    context.beginPath();
+    context.arc(jointX(joint), jointY(joint), Math.max(3 * lineScale, 2), 0, 2 * Math.PI);
+    context.fill();
+  }
+}
+
+export default function ShotReplay({
+  shotId,
+  originalVideoUrl,
+  fallbackVideoUrl,
+  poster,
+  loadOnPlay = false,
+  className = "",
+}) {
+  const BACKEND_BASE_URL = import.meta.env.VITE_BACKEND_BASE_URL;
+  const videoRef = useRef(null);
+  const canvasRef = useRef(null);
+  const [requested, setRequested] = useState(!loadOnPlay);
+  // undefined while loading, null if the shot has no overlay stream
+  const [overlay, setOverlay] = useState(undefined);
+
+  useEffect(() => {
+    if (!requested || !shotId) return;
+
+    let cancelled = false;
+    axios
+      .get(`${BACKEND_BASE_URL}/shots/${shotId}/overlay`, { withCredentials: true })
+      .then((response) => {
+        if (!cancelled) setOverlay(decodeOverlay(response.data));
+      })
+      .catch(() => {
+        if (!cancelled) setOverlay(null);
+      });
+
+    return () => {
+      cancelled = true;
+    };
+  }, [requested, shotId, BACKEND_BASE_URL]);
+
+  useEffect(() => {
+    const video = videoRef.current;
+    const canvas = canvasRef.current;
+    if (!overlay || !video || !canvas) return;
+
+    let frameRequest = null;
+    const redraw = () => drawSkeleton(canvas, video, overlay);
+    const onFrame = () => {
+      redraw();
+      frameRequest = video.requestVideoFrameCallback
+        ? video.requestVideoFrameCallback(onFrame)
+        : requestAnimationFrame(onFrame);
+    };
+
+    onFrame();
+    video.addEventListener("seeked", redraw);
+    window.addEventListener("resize", redraw);
+
+    return () => {
+      if (video.cancelVideoFrameCallback && video.requestVideoFrameCallback) {
+        video.cancelVideoFrameCallback(frameRequest);
+      } else {
+        cancelAnimationFrame(frameRequest);
+      }
+      video.removeEventListener("seeked", redraw);
+      window.removeEventListener("resize", redraw);
+    };
+  }, [overlay]);
+
+  // shots without an overlay stream play the server-rendered video instead
+  if (overlay === null && fallbackVideoUrl) {
+    return (
+      <video
+        src={fallbackVideoUrl}
+        poster={poster}
+        controls
+        autoPlay={loadOnPlay}
+        className={className}
+      />
+    );
+  }
+
+  return (
+    <div className="relative">
+      <video
+        ref={videoRef}
+        src={originalVideoUrl}
+        poster={poster}
+        preload={loadOnPlay ? "none" : "metadata"}
+        controls
+        onPlay={() => setRequested(true)}
+        className={className}
+      />
+      <canvas
+        ref={canvasRef}
+        className="pointer-events-none absolute"
+      />
+    </div>
+  );
+}
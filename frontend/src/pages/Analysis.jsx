@@ -2,6 +2,24 @@ import React, { useEffect, useState } from "react";
 import { useParams, useLocation } from "react-router-dom";
 import axios from "axios";
 import FeedbackItem from "../components/FeedbackItem";
+import ShotReplay from "../components/ShotReplay";
+
+// metric explanations and ranges are the same for every shot, fetched once per metadata version
+const metricMetadataRequests = {};
+
+function loadMetricMetadata(baseUrl, version) {
+  const key = version || "latest";
+  if (!metricMetadataRequests[key]) {
+    metricMetadataRequests[key] = axios
+      .get(`${baseUrl}/metrics/metadata`, { params: version ? { v: version } : {} })
+      .then((response) => response.data)
+      .catch((error) => {
+        delete metricMetadataRequests[key];
+        throw error;
+      });
+  }
+  return metricMetadataRequests[key];
+}
 
 export default function Analysis() {
   const BACKEND_BASE_URL = import.meta.env.VITE_BACKEND_BASE_URL;
@@ -16,6 +34,7 @@ export default function Analysis() {
     "Follow-through": false,
   });
   const [activeMetrics, setActiveMetrics] = useState({});
+  const [metricMetadata, setMetricMetadata] = useState(null);
 
   useEffect(() => {
     const fetchData = async () => {
@@ -40,6 +59,22 @@ export default function Analysis() {
     fetchData();
   }, [id, location.state, BACKEND_BASE_URL]);
 
+  const metricMetadataVersion = analysisData?.metric_metadata_version;
+  useEffect(() => {
+    if (!analysisData) return;
+
+    let cancelled = false;
+    loadMetricMetadata(BACKEND_BASE_URL, metricMetadataVersion)
+      .then((metadata) => {
+        if (!cancelled) setMetricMetadata(metadata);
+      })
+      .catch((error) => console.error("Error loading metric metadata:", error));
+
+    return () => {
+      cancelled = true;
+    };
+  }, [analysisData, metricMetadataVersion, BACKEND_BASE_URL]);
+
   if (loading) {
     return (
       <div className="min-h-screen bg-[#0A0A0B] text-white flex items-center justify-center">
@@ -61,14 +96,15 @@ export default function Analysis() {
   }
 
   const analysisVideoUrl = analysisData.video_url;
+  const originalVideoUrl = analysisData.original_video_url;
   const setupFrameUrl = analysisData.setup_frame_url;
   const releaseFrameUrl = analysisData.release_frame_url;
   const followFrameUrl = analysisData.follow_frame_url;
   const safeProbability = analysisData.make_probability || 0;
   const formScore = (safeProbability / 10).toFixed(1);
   const metrics = analysisData.metrics || {};
-  const metricExplanations = analysisData.metric_explanations || {};
-  const metricRanges = analysisData.metric_ranges || {};
+  const metricExplanations = metricMetadata?.explanations || {};
+  const metricRanges = metricMetadata?.ranges || {};
   const setupMetrics = Object.entries(metrics).filter(([key]) =>
     key.startsWith("S ")
   );
@@ -335,7 +371,15 @@ export default function Analysis() {
                 </span>
               </div>
 
-              {analysisVideoUrl ? (
+              {originalVideoUrl ? (
+                <ShotReplay
+                  shotId={analysisData.id || id}
+                  originalVideoUrl={originalVideoUrl}
+                  fallbackVideoUrl={analysisVideoUrl}
+                  poster={setupFrameUrl}
+                  className="w-full rounded-2xl border border-white/10 bg-black"
+                />
+              ) : analysisVideoUrl ? (
                 <video
                   src={analysisVideoUrl}
                   controls
@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from "react";
+import React, { useCallback, useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import axios from "axios";
 import {
@@ -7,13 +7,39 @@ import {
   PlusIcon,
 } from "@heroicons/react/outline";
 
+const PAGE_SIZE = 20;
+
+const STATUS_FILTERS = [
+  { value: "", label: "All" },
+  { value: "complete", label: "Complete" },
+  { value: "queued,processing", label: "In progress" },
+  { value: "failed", label: "Failed" },
+];
+
 export default function MyVideos() {
   const BACKEND_BASE_URL = import.meta.env.VITE_BACKEND_BASE_URL;
   const [sessions, setSessions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [statusFilter, setStatusFilter] = useState("");
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState("");
   const navigate = useNavigate();
 
+  // one page of the listing, continuing after the cursor of the previous one
+  const fetchPage = useCallback(
+    (after) =>
+      axios.get(`${BACKEND_BASE_URL}/sessions`, {
+        params: {
+          limit: PAGE_SIZE,
+          ...(after ? { after } : {}),
+          ...(statusFilter ? { status: statusFilter } : {}),
+        },
+        withCredentials: true,
+      }),
+    [BACKEND_BASE_URL, statusFilter]
+  );
+
   useEffect(() => {
     const fetchData = async () => {
       try {
@@ -21,11 +47,10 @@ export default function MyVideos() {
           withCredentials: true,
         });
 
-        const sessionsRes = await axios.get(`${BACKEND_BASE_URL}/sessions`, {
-          withCredentials: true,
-        });
+        const sessionsRes = await fetchPage(null);
 
-        setSessions(sessionsRes.data);
+        setSessions(sessionsRes.data.sessions);
+        setNextCursor(sessionsRes.data.next_cursor);
       } catch (err) {
         if (err.response?.status === 401) {
           navigate("/signin");
@@ -38,7 +63,20 @@ export default function MyVideos() {
     };
 
     fetchData();
-  }, [navigate, BACKEND_BASE_URL]);
+  }, [navigate, BACKEND_BASE_URL, fetchPage]);
+
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const sessionsRes = await fetchPage(nextCursor);
+      setSessions((prev) => [...prev, ...sessionsRes.data.sessions]);
+      setNextCursor(sessionsRes.data.next_cursor);
+    } catch (err) {
+      setError("Failed to load sessions. Please try again later.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   if (loading) {
     return (
@@ -79,13 +117,27 @@ export default function MyVideos() {
             </p>
           </div>
 
-          <button
-            onClick={() => navigate("/record")}
-            className="inline-flex items-center gap-2 rounded-full bg-white px-5 py-3 text-sm font-medium text-black transition hover:bg-zinc-200"
-          >
-            <PlusIcon className="h-4 w-4" />
-            New Upload
-          </button>
+          <div className="flex items-center gap-3">
+            <select
+              value={statusFilter}
+              onChange={(e) => setStatusFilter(e.target.value)}
+              className="rounded-full border border-white/10 bg-white/5 px-4 py-3 text-sm text-zinc-300"
+            >
+              {STATUS_FILTERS.map((filter) => (
+                <option key={filter.value} value={filter.value}>
+                  {filter.label}
+                </option>
+              ))}
+            </select>
+
+            <button
+              onClick={() => navigate("/record")}
+              className="inline-flex items-center gap-2 rounded-full bg-white px-5 py-3 text-sm font-medium text-black transition hover:bg-zinc-200"
+            >
+              <PlusIcon className="h-4 w-4" />
+              New Upload
+            </button>
+          </div>
         </div>
 
         {sessions.length === 0 ? (
@@ -155,7 +207,9 @@ export default function MyVideos() {
                     {session.preview_video_url ? (
                       <video
                         src={session.preview_video_url}
+                        poster={session.preview_thumbnail_url}
                         className="h-full w-full object-cover"
+                        preload="none"
                         muted
                         onMouseOver={(e) => e.target.play()}
                         onMouseOut={(e) => {
@@ -175,6 +229,18 @@ export default function MyVideos() {
             ))}
           </div>
         )}
+
+        {nextCursor ? (
+          <div className="mt-8 flex justify-center">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="rounded-full border border-white/10 bg-white/5 px-5 py-3 text-sm text-zinc-300 transition hover:bg-white/[0.08] disabled:opacity-50"
+            >
+              {loadingMore ? "Loading..." : "Load more sessions"}
+            </button>
+          </div>
+        ) : null}
       </div>
     </div>
   );
@@ -1,12 +1,15 @@
 import React, { useEffect, useRef, useState } from "react";
 import { useNavigate, useParams } from "react-router-dom";
 import axios from "axios";
+import ShotReplay from "../components/ShotReplay";
 import ShotTimeline from "../components/ShotTimeline";
 import {
   ArrowRightIcon
 } from "@heroicons/react/outline";
 
 const SESSION_FPS = 30;
+const STATUS_POLL_INTERVAL_MS = 2000;
+const PENDING_STATUSES = ["queued", "processing"];
 
 function formatSessionDate(dateString) {
   if (!dateString) return "Unknown date";
@@ -61,6 +64,36 @@ export default function SessionDetail() {
     fetchSession();
   }, [BACKEND_BASE_URL, id, navigate]);
 
+  const sessionStatus = sessionData?.status;
+
+  useEffect(() => {
+    if (!PENDING_STATUSES.includes(sessionStatus)) return undefined;
+
+    // poll the lightweight status endpoint until the background job finishes
+    const intervalId = setInterval(async () => {
+      try {
+        const statusResponse = await axios.get(
+          `${BACKEND_BASE_URL}/sessions/${id}/status`,
+          { withCredentials: true }
+        );
+
+        if (PENDING_STATUSES.includes(statusResponse.data.status)) {
+          setSessionData((prev) => ({ ...prev, ...statusResponse.data }));
+          return;
+        }
+
+        const response = await axios.get(`${BACKEND_BASE_URL}/sessions/${id}`, {
+          withCredentials: true,
+        });
+        setSessionData(response.data);
+      } catch (err) {
+        console.error("Error polling session status:", err);
+      }
+    }, STATUS_POLL_INTERVAL_MS);
+
+    return () => clearInterval(intervalId);
+  }, [BACKEND_BASE_URL, id, sessionStatus]);
+
   const handleTimelineShotClick = (shot) => {
     setActiveShotId(shot.id);
 
@@ -109,6 +142,13 @@ export default function SessionDetail() {
   const shots = sessionData.shots || [];
   const activeShot =
     shots.find((shot) => shot.id === activeShotId) || shots[0] || null;
+  const isProcessing = PENDING_STATUSES.includes(sessionData.status);
+  const progressPercent = sessionData.total_frames
+    ? Math.min(
+        Math.round(((sessionData.frames_processed || 0) / sessionData.total_frames) * 100),
+        100
+      )
+    : 0;
 
   return (
     <div className="min-h-screen bg-[#0A0A0B] text-white relative overflow-hidden">
@@ -146,6 +186,25 @@ export default function SessionDetail() {
           </div>
         </div>
 
+        {isProcessing && (
+          <div className="mb-6 rounded-2xl border border-blue-400/20 bg-blue-500/10 px-5 py-4 text-sm text-blue-300">
+            <div className="flex items-center justify-between">
+              <span>
+                {sessionData.status === "queued"
+                  ? "Session queued for analysis..."
+                  : "Detecting and analysing shots..."}
+              </span>
+              <span className="font-mono">{progressPercent}%</span>
+            </div>
+            <div className="mt-3 h-2 overflow-hidden rounded-full bg-white/10">
+              <div
+                className="h-full rounded-full bg-blue-400"
+                style={{ width: `${progressPercent}%` }}
+              />
+            </div>
+          </div>
+        )}
+
         {sessionData.processing_error && (
           <div className="mb-6 rounded-2xl border border-red-400/20 bg-red-500/10 px-5 py-4 text-sm text-red-300">
             {sessionData.processing_error}
@@ -257,11 +316,14 @@ export default function SessionDetail() {
                       </button>
                     </div>
 
-                    {shot.video_url ? (
+                    {shot.original_video_url ? (
                       <div className="mt-5">
-                        <video
-                          src={shot.video_url}
-                          controls
+                        <ShotReplay
+                          shotId={shot.id}
+                          originalVideoUrl={shot.original_video_url}
+                          fallbackVideoUrl={shot.video_url}
+                          poster={shot.setup_frame_url}
+                          loadOnPlay
                           className="w-full rounded-[1.25rem] border border-white/10 bg-black"
                         />
                       </div>